@@ -0,0 +1,9 @@
+"""
+test setup - library modules are imported flat from vtklib, as its scripts do
+"""
+import os
+import sys
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'vtklib'))
+logging.disable(logging.CRITICAL)
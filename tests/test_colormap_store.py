@@ -0,0 +1,48 @@
+"""
+binary color maps store against pickled color maps
+"""
+import cPickle as pickle
+import numpy
+import pytest
+import colors
+
+
+@pytest.fixture(scope='module')
+def pickled():
+    """ color maps of pickled source file """
+    with open(colors.COLORMAPS_FILE, 'rb') as f:
+        return pickle.load(f)
+
+
+def assertSameMaps(maps, expected):
+    """ same names and float32 rounded tables """
+    assert sorted(maps) == sorted(expected)
+    for name, table in expected.iteritems():
+        numpy.testing.assert_array_equal(maps[name], numpy.asarray(table, dtype=numpy.float32).reshape(-1, 4))
+
+
+def test_round_trip(pickled, tmpdir):
+    path = str(tmpdir.join('colormaps.bin'))
+    colors.write_colormap_store(pickled, path)
+    assertSameMaps(colors.read_colormap_store(path), pickled)
+
+    name = sorted(pickled)[0]
+    numpy.testing.assert_array_equal(colors.read_colormap(name, path), colors.read_colormap_store(path)[name])
+    assert colors.read_colormap('missing', path) is None
+
+
+def test_shipped_store_matches_pickle(pickled):
+    assertSameMaps(colors.read_colormap_store(), pickled)
+
+
+def test_empty_store(tmpdir):
+    path = str(tmpdir.join('empty.bin'))
+    colors.write_colormap_store({}, path)
+    assert colors.read_colormap_store(path) == {}
+
+
+def test_not_a_store(tmpdir):
+    path = tmpdir.join('other.bin')
+    path.write('x' * 64)
+    with pytest.raises(ValueError):
+        colors.read_colormap_index(str(path))
@@ -0,0 +1,62 @@
+"""
+incremental value ranges against full nan aware scans
+"""
+import numpy
+import pytest
+from vtk_surface import RangeTracker
+
+
+def assertRange(tracker, rows):
+    """ tracker range equals nanmin / nanmax of all rows """
+    numpy.testing.assert_array_equal(tracker.range(), (numpy.nanmin(rows), numpy.nanmax(rows)))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_row_updates_match_full_scan(seed):
+    random = numpy.random.RandomState(seed)
+    rows = random.standard_normal((12, 9))
+    rows[random.random_sample(rows.shape) < 0.1] = numpy.nan
+    tracker = RangeTracker(rows)
+    assertRange(tracker, rows)
+
+    for _ in xrange(200):
+        index = random.randint(rows.shape[0])
+        rows[index] = random.standard_normal(rows.shape[1]) * random.choice([0.1, 1., 3.])
+        rows[index, random.random_sample(rows.shape[1]) < 0.2] = numpy.nan
+        tracker.update(index, rows[index])
+        assertRange(tracker, rows)
+
+
+def test_overwritten_extremes_are_rescanned():
+    rows = numpy.arange(20.).reshape(4, 5)
+    tracker = RangeTracker(rows)
+
+    rows[3] = 1.
+    tracker.update(3, rows[3])
+    assertRange(tracker, rows)
+
+    rows[0] = 2.
+    tracker.update(0, rows[0])
+    assertRange(tracker, rows)
+
+
+def test_slice_updates_and_missing_rows():
+    rows = numpy.arange(20.).reshape(4, 5)
+    tracker = RangeTracker(rows)
+
+    rows[1:3] = numpy.nan
+    tracker.update(slice(1, 3), rows[1:3])
+    assertRange(tracker, rows)
+
+    rows[0] = rows[3] = numpy.nan
+    rows[3, 2] = -7.
+    tracker.update(slice(0, 4), rows)
+    assertRange(tracker, rows)
+
+
+def test_reset_and_precision():
+    rows = numpy.linspace(0.1, 0.7, 12).reshape(3, 4)
+    tracker = RangeTracker(rows[:1])
+    tracker.reset(rows)
+    assertRange(tracker, rows)
+    assert tracker.range(numpy.float32) == (float(numpy.float32(0.1)), float(numpy.float32(0.7)))
@@ -0,0 +1,43 @@
+"""
+rolling window ring buffer order
+"""
+import numpy
+import pytest
+from vtk_surface import RollingWindow
+
+
+def rows(start, count, size=7):
+    """ distinct rows start .. start + count - 1 """
+    return numpy.arange(start, start + count)[:, numpy.newaxis] * 10. + numpy.arange(size)[numpy.newaxis, :]
+
+
+@pytest.mark.parametrize('axis', [0, 1])
+@pytest.mark.parametrize('appended', [1, 4, 5, 9, 23])
+def test_window_order_after_wraparound(axis, appended):
+    capacity = 5
+    first = rows(0, 3)
+    ring = RollingWindow(axis, capacity, numpy.arange(3.), first if axis == 0 else first.T)
+
+    for i in xrange(3, 3 + appended):
+        ring.append(float(i), rows(i, 1)[0])
+
+    last = 3 + appended
+    count = min(last, capacity)
+    window = ring.window()
+    z = ring.Z[window] if axis == 0 else ring.Z[:, window].T
+
+    numpy.testing.assert_array_equal(ring.coords[window], numpy.arange(last - count, last))
+    numpy.testing.assert_array_equal(z, rows(last - count, count))
+    assert ring.coordsRange() == (last - count, last - 1)
+
+
+def test_window_keeps_last_rows_of_longer_data():
+    data = rows(0, 8)
+    ring = RollingWindow(0, 5, numpy.arange(8.), data, data * 2)
+    ring.append(8., rows(8, 1)[0], rows(8, 1)[0] * 2)
+
+    window = ring.window()
+    numpy.testing.assert_array_equal(ring.coords[window], numpy.arange(4, 9))
+    numpy.testing.assert_array_equal(ring.Z[window], rows(4, 5))
+    numpy.testing.assert_array_equal(ring.V[window], rows(4, 5) * 2)
+    assert ring.extent() == (window.start, window.stop - 1, 0, 6, 0, 0)
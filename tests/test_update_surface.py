@@ -0,0 +1,82 @@
+"""
+in place surface update against surface built from scratch
+"""
+import numpy
+import pytest
+import vtk
+from vtk.util import numpy_support
+from vtk_surface import VTKSurface3D
+
+
+X = numpy.linspace(-3, 3, 40)
+Y = numpy.linspace(-2, 2, 30)
+CUBIC_Y = Y ** 3
+
+
+def matrix(x, y, phase=0.):
+    """ Z matrix over x, y axes """
+    return numpy.sin(x + phase)[:, numpy.newaxis] * numpy.cos(y)[numpy.newaxis, :]
+
+
+def geometry(surface):
+    """ mapped polygon points, scalars, bounds and scalar range """
+    surface.mapper.Update()
+    poly = surface.mapper.GetInput()
+    points = numpy_support.vtk_to_numpy(poly.GetPoints().GetData())
+    scalars = numpy_support.vtk_to_numpy(poly.GetPointData().GetScalars())
+    return points, scalars, poly.GetNumberOfPolys(), surface.getBounds(), surface.mapper.GetScalarRange()
+
+
+def assertSameGeometry(surface, fresh):
+    """ same mapped geometry up to float32 rounding """
+    points, scalars, polys, bounds, scalarRange = geometry(surface)
+    expected = geometry(fresh)
+    numpy.testing.assert_allclose(points, expected[0], rtol=1e-6, atol=1e-6)
+    numpy.testing.assert_allclose(scalars, expected[1], rtol=1e-6, atol=1e-6)
+    assert polys == expected[2]
+    numpy.testing.assert_allclose(bounds, expected[3], rtol=1e-6, atol=1e-6)
+    numpy.testing.assert_allclose(scalarRange, expected[4], rtol=1e-6, atol=1e-6)
+
+
+@pytest.mark.parametrize('y, kwargs', [
+    (CUBIC_Y, {}),
+    (Y, {}),
+    (CUBIC_Y, {'gridData': False}),
+    (CUBIC_Y, {'maskInvalid': True}),
+    (CUBIC_Y, {'gridData': False, 'maskInvalid': True}),
+    (CUBIC_Y, {'precision': 'float64'}),
+])
+def test_update_matches_fresh_render(y, kwargs):
+    z = matrix(X, y)
+    z2 = matrix(X, y, 0.5) * 3
+    if kwargs.get('maskInvalid'):
+        z[5, 7] = z2[11, 3] = numpy.nan
+
+    surface = VTKSurface3D((X, y, z), renderer=vtk.vtkRenderer(), **kwargs)
+    mapper = surface.mapper
+    surface.SetValue((X * 2, y, z2), **kwargs)
+    assert surface.mapper is mapper
+
+    fresh = VTKSurface3D((X * 2, y, z2), renderer=vtk.vtkRenderer(), **kwargs)
+    assertSameGeometry(surface, fresh)
+
+
+def test_update_with_values_matches_fresh_render():
+    z, v = matrix(X, CUBIC_Y), matrix(CUBIC_Y, X).T
+    surface = VTKSurface3D((X, CUBIC_Y, z, v), renderer=vtk.vtkRenderer())
+    mapper = surface.mapper
+    surface.SetValue((X, CUBIC_Y, z * 2, v - 1))
+    assert surface.mapper is mapper
+
+    fresh = VTKSurface3D((X, CUBIC_Y, z * 2, v - 1), renderer=vtk.vtkRenderer())
+    assertSameGeometry(surface, fresh)
+
+
+def test_shape_change_rebuilds():
+    surface = VTKSurface3D((X, CUBIC_Y, matrix(X, CUBIC_Y)), renderer=vtk.vtkRenderer())
+    mapper = surface.mapper
+    surface.SetValue((X[:25], CUBIC_Y, matrix(X[:25], CUBIC_Y)))
+    assert surface.mapper is not mapper
+
+    fresh = VTKSurface3D((X[:25], CUBIC_Y, matrix(X[:25], CUBIC_Y)), renderer=vtk.vtkRenderer())
+    assertSameGeometry(surface, fresh)
@@ -3,7 +3,6 @@ Multi set model
 """
 
 from renderers import VTKRenderController
-from enaml.application import deferred_call
 import vtk
 
 
@@ -21,8 +20,7 @@ class RenderViewController(VTKRenderController):
         set models background
         """
         self.bgColor = background
-        if self.view:
-            deferred_call(self.view.render)
+        self.requestRender()
 
     def set_interactor_style(self, style):
         """
@@ -0,0 +1 @@
+../vtklib/renderers.py
\ No newline at end of file
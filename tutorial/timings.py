@@ -0,0 +1 @@
+../vtklib/timings.py
\ No newline at end of file
@@ -1,8 +1,14 @@
 """
 Colors database
 """
+import os
+import struct
+import threading
 import cPickle as pickle
+import functools32 as func
+import numpy
 import vtk
+from vtk.util import numpy_support
 from matplotlib import cm
 import matplotlib.colors
 
@@ -23,37 +29,216 @@ COLOR_MAPS = ['Accent', 'Blues', 'BrBG', 'BuGn', 'BuPu', 'Dark2', 'GnBu', 'Green
               'spectral', 'spring', 'summer', 'winter', 'rainbow']
 
 
+COLORMAPS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'colormaps.ser')
+COLORMAPS_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'colormaps.bin')
+
+LOOKUP_TABLES_CACHE_SIZE = 32
+
+# color maps store layout: header, index entry per map, then float32 RGBA tables one after another
+STORE_MAGIC = 'VCMP'
+STORE_VERSION = 1
+STORE_HEADER = struct.Struct('<4sII')  # magic, version, number of maps
+STORE_ENTRY = struct.Struct('<32sQI')  # name, table offset, number of colors
+STORE_DTYPE = numpy.dtype('<f4')
+
+
+def write_colormap_store(colorMaps, path=COLORMAPS_STORE):
+    """
+    write color maps {name: [(r, g, b, a), ...]} into binary store
+    """
+    names = sorted(colorMaps)
+    tables = [numpy.asarray(colorMaps[name], dtype=STORE_DTYPE).reshape(-1, 4) for name in names]
+
+    offset = STORE_HEADER.size + STORE_ENTRY.size * len(names)
+    index = []
+    for name, table in zip(names, tables):
+        if len(name) >= 32:
+            raise ValueError('Color map name too long: %s' % name)
+        index.append(STORE_ENTRY.pack(name, offset, len(table)))
+        offset += table.nbytes
+
+    with open(path, 'wb') as f:
+        f.write(STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, len(names)))
+        f.write(''.join(index))
+        for table in tables:
+            f.write(table.tostring())
+
+
+def read_colormap_index(path=COLORMAPS_STORE):
+    """
+    read color maps store index - {name: (offset, number of colors)}
+    """
+    with open(path, 'rb') as f:
+        magic, version, count = STORE_HEADER.unpack(f.read(STORE_HEADER.size))
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise ValueError('Not a color maps store: %s' % path)
+        data = f.read(STORE_ENTRY.size * count)
+
+    index = {}
+    for i in xrange(count):
+        name, offset, n = STORE_ENTRY.unpack_from(data, i * STORE_ENTRY.size)
+        index[name.rstrip('\0')] = (offset, n)
+
+    return index
+
+
+def read_colormap_store(path=COLORMAPS_STORE):
+    """
+    memory map color maps store - {name: (n, 4) float32 table}, bytes are read only when a table is used
+    """
+    index = read_colormap_index(path)
+    if not index:
+        return {}
+
+    start = min(offset for offset, _n in index.itervalues())
+    data = numpy.memmap(path, dtype=STORE_DTYPE, mode='r', offset=start)
+
+    maps = {}
+    for name, (offset, n) in index.iteritems():
+        first = (offset - start) / STORE_DTYPE.itemsize
+        maps[name] = data[first:first + n * 4].reshape(n, 4)
+
+    return maps
+
+
+def read_colormap(name, path=COLORMAPS_STORE):
+    """
+    read single color map table from store, None if not known
+    """
+    entry = read_colormap_index(path).get(name)
+    if entry is None:
+        return None
+
+    offset, n = entry
+    return numpy.memmap(path, dtype=STORE_DTYPE, mode='r', offset=offset, shape=(n, 4))
+
+
+def convert_colormaps(source=COLORMAPS_FILE, target=COLORMAPS_STORE):
+    """
+    convert pickled color maps into binary store
+    """
+    with open(source, 'rb') as f:
+        colorMaps = pickle.load(f)
+    write_colormap_store(colorMaps, target)
+
+
+def resampleColormap(table, numberOfColors):
+    """
+    linearly resample (n, 4) RGBA table to requested number of colors
+    """
+    n = len(table)
+    if n == numberOfColors or n < 2:
+        return table
+
+    src = numpy.arange(n)
+    dst = numpy.linspace(0, n - 1, numberOfColors)
+    return numpy.column_stack([numpy.interp(dst, src, table[:, i]) for i in xrange(4)])
+
+
+def buildLookupTable(table, reversed=False, numberOfColors=None):
+    """
+    build lookup table from (n, 4) RGBA table in one call - table is never modified
+    """
+    table = numpy.asarray(table, dtype=numpy.float64).reshape(-1, 4)
+    if reversed:
+        table = table[::-1]
+    if numberOfColors:
+        table = resampleColormap(table, numberOfColors)
+
+    # same rounding as vtkLookupTable.SetTableValue
+    rgba = (table * 255.0 + 0.5).astype(numpy.uint8)
+
+    clut = vtk.vtkLookupTable()
+    clut.SetNumberOfTableValues(len(rgba))
+    clut.SetTable(numpy_support.numpy_to_vtk(rgba, deep=True, array_type=vtk.VTK_UNSIGNED_CHAR))
+
+    return clut
+
+
+class ColorMapRegistry(object):
+    """ process wide color maps registry - color maps are loaded once on first use """
+
+    def __init__(self, path=COLORMAPS_STORE, source=COLORMAPS_FILE, cacheSize=LOOKUP_TABLES_CACHE_SIZE):
+        """ default init
+                path      - binary color maps store
+                source    - pickled color maps used when there is no binary store
+                cacheSize - number of built lookup tables kept by (name, reversed, numberOfColors)
+        """
+        self.path = path
+        self.source = source
+        self._colorMaps = None
+        self._lock = threading.Lock()
+        self.lookupTable = func.lru_cache(maxsize=cacheSize)(self._buildLookupTable)
+
+    def colorMaps(self):
+        """ get all color maps - shared, must not be modified """
+        if self._colorMaps is None:
+            with self._lock:
+                if self._colorMaps is None:
+                    if os.path.exists(self.path):
+                        self._colorMaps = read_colormap_store(self.path)
+                    else:
+                        with open(self.source, 'rb') as f:
+                            self._colorMaps = pickle.load(f)
+        return self._colorMaps
+
+    def colorMap(self, name):
+        """ get color map by name """
+        return self.colorMaps().get(name, [])
+
+    def _buildLookupTable(self, name, reversed, numberOfColors=None):
+        """ build lookup table for color map, None if not known """
+        lut = self.colorMap(name)
+        if not len(lut):
+            return None
+
+        return buildLookupTable(lut, reversed, numberOfColors)
+
+    def clear(self):
+        """ drop loaded color maps and cached lookup tables """
+        with self._lock:
+            self._colorMaps = None
+        self.lookupTable.cache_clear()
+
+
+REGISTRY = ColorMapRegistry()
+
+
 def load_colormaps():
     """
     load color maps
     """
-    return pickle.load(open('colormaps.ser'))
+    return REGISTRY.colorMaps()
 
 
 def load_colormap(name='hot'):
     """
     load color map
     """
-    maps = load_colormaps()
-    return maps.get(name, [])
+    return REGISTRY.colorMap(name)
 
 
-def buildColormap(color='blue-red', reversed=True):
-        clut = vtk.vtkLookupTable()
-        luts = load_colormaps()
+def lookup_table(name, reversed=False, numberOfColors=None):
+    """
+    get lookup table for color map - private copy of the cached one, None if color map is not known
+    """
+    lut = REGISTRY.lookupTable(name, bool(reversed), numberOfColors or None)
+    if lut is None:
+        return None
 
-        if color in luts:
-            lut = luts[color]
-            if reversed:
-                lut.reverse()
-            clut.SetNumberOfColors(len(lut))
-            clut.Build()
-            for i in xrange(len(lut)):
-                lt = lut[i]
-                clut.SetTableValue(i, lt[0], lt[1], lt[2], lt[3])
+    clut = vtk.vtkLookupTable()
+    clut.DeepCopy(lut)
+    return clut
+
+
+def buildColormap(color='blue-red', reversed=True, numberOfColors=None):
+        clut = lookup_table(color, reversed, numberOfColors)
 
+        if clut is not None:
             return clut
 
+        clut = vtk.vtkLookupTable()
+
         hue_range = 0.0, 0.6667
         saturation_range = 1.0, 1.0
         value_range = 1.0, 1.0
@@ -77,6 +262,8 @@ def buildColormap(color='blue-red', reversed=True):
                 saturation_range = 0.0, 0.0
                 value_range = 0.0, 1.0
 
+        if numberOfColors:
+            clut.SetNumberOfColors(numberOfColors)
         clut.SetHueRange(hue_range)
         clut.SetSaturationRange(saturation_range)
         clut.SetValueRange(value_range)
@@ -97,3 +284,7 @@ def get_colormaps():
                 color_maps.append(k)
 
     return sorted(color_maps)
+
+
+if __name__ == '__main__':
+    convert_colormaps()
@@ -2,8 +2,10 @@
 Data sources
 """
 
+import os
 import math
 import numpy
+import tempfile
 
 ft = lambda n: n / 10.
 
@@ -46,6 +48,24 @@ def dsin():
     return data
 
 
+def csin():
+    """
+    sample func - columnar (x, y, Z) data
+    """
+    xr = numpy.arange(-7., 7.05, 0.1)
+    yr = numpy.arange(-5., 5.05, 0.05)
+    xx, yy = numpy.meshgrid(xr, yr, indexing='ij')
+    return xr, yr, sin(xx, yy)
+
+
+def msin():
+    """
+    sample func - memory mapped columnar (x, y, Z) data
+    """
+    path = os.path.join(tempfile.gettempdir(), 'msin')
+    return load_mapped_surface(save_mapped_surface(path, *csin()))
+
+
 def nonedatarandom():
     """
     sample func
@@ -192,3 +212,47 @@ def grid_data():
 
     return xi, yi, zi
 
+
+def map_array(source, dtype=numpy.float32, shape=None, order='C', offset=0):
+    """
+    read only memory map of .npy or raw file, numpy arrays are passed through
+    """
+    if isinstance(source, numpy.ndarray):
+        return source
+
+    if source.endswith('.npy'):
+        return numpy.load(source, mmap_mode='r')
+
+    return numpy.memmap(source, dtype=dtype, mode='r', shape=shape, order=order, offset=offset)
+
+
+def mapped_surface(z, x=None, y=None, shape=None, dtype=numpy.float32, order='F', offset=0):
+    """
+    memory mapped columnar (x, y, Z) data - pages are read on demand, nothing is copied
+        z         - Z matrix .npy or raw file, raw file needs (nx, ny) shape, dtype, order and header offset
+        x, y      - axis vectors as numpy arrays, .npy or raw files, natural indexes when not given
+    fortran ordered Z (x index fastest) is wrapped by vtk surface scalars directly
+    """
+    vz = map_array(z, dtype, shape, order, offset)
+    vx = numpy.arange(vz.shape[0]) if x is None else map_array(x, dtype)
+    vy = numpy.arange(vz.shape[1]) if y is None else map_array(y, dtype)
+
+    return vx, vy, vz
+
+
+def save_mapped_surface(path, x, y, z):
+    """
+    save columnar (x, y, Z) data as <path>.x.npy, <path>.y.npy and fortran ordered <path>.z.npy, returns path
+    """
+    numpy.save(path + '.x.npy', numpy.asarray(x))
+    numpy.save(path + '.y.npy', numpy.asarray(y))
+    numpy.save(path + '.z.npy', numpy.asfortranarray(z))
+
+    return path
+
+
+def load_mapped_surface(path):
+    """
+    memory map columnar (x, y, Z) data saved by save_mapped_surface
+    """
+    return mapped_surface(path + '.z.npy', path + '.x.npy', path + '.y.npy')
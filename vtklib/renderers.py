@@ -2,10 +2,13 @@
 VTK render model
 """
 
+import time
 import logging
 
 from atom.api import Atom, Dict, Str, observe, Value, Int, Tuple, List
+from enaml.application import deferred_call, timed_call
 from functools import partial
+from timings import StageTimings, stage
 import vtk
 
 
@@ -21,6 +24,67 @@ INTERACTION_STYLES = {
 }
 
 
+class RenderScheduler(object):
+    """
+    render coalescing - views are marked dirty and rendered at most once per frame,
+    frames are optionally capped at maxFps (0 - no cap)
+    """
+
+    def __init__(self, maxFps=0):
+        """ default init """
+        self.maxFps = maxFps
+        self.dirty = []
+        self.pending = False
+        self.lastFrame = 0.
+        self.profiles = {}
+
+    def request(self, view, timings=None, done=None):
+        """
+        mark view dirty and schedule a frame unless one is already pending
+            timings - record view render as 'render' stage there
+            done    - called after view is rendered
+        """
+        if view is None:
+            return
+
+        if view not in self.dirty:
+            self.dirty.append(view)
+
+        if timings is not None or done:
+            self.profiles[id(view)] = (timings, done)
+
+        if self.pending:
+            return
+
+        self.pending = True
+        delay = self.lastFrame + 1. / self.maxFps - time.time() if self.maxFps > 0 else 0
+        if delay > 0:
+            timed_call(int(delay * 1000), self.flush)
+        else:
+            deferred_call(self.flush)
+
+    def flush(self):
+        """ render all dirty views once """
+        views, self.dirty = self.dirty, []
+        self.pending = False
+        self.lastFrame = time.time()
+        for view in views:
+            timings, done = self.profiles.pop(id(view), (None, None))
+            with stage('render', timings):
+                view.render()
+            if done:
+                done()
+
+
+# scheduler shared by all controllers, so views updated together render in the same frame
+SCHEDULER = RenderScheduler()
+
+
+def request_render(view):
+    """ request coalesced render of the view """
+    SCHEDULER.request(view)
+
+
 class VTKRenderController(Atom):
     """ vtk render controller - supply renderers to VTKCanvas  """
 
@@ -38,18 +102,26 @@ class VTKRenderController(Atom):
     appName = Str()
     logFile = Str()
     kwargs = Dict()
+    scheduler = Value()
+    timings = Value()
 
     def __init__(self, numOfRenderers=1, view=None, callbacks=None, bgColor=None, customPorts=None,
                  customBackgrounds=None, logToFile=True, logFile=None, appName=None,
-                 interactorStyle=None, motionFactor=None, zoomFactor=None, **kwargs):
+                 interactorStyle=None, motionFactor=None, zoomFactor=None, maxFps=None, scheduler=None,
+                 profile=False, **kwargs):
         """ default init
                 numOfRenderers - how many renderers to create
                 bgColor        - default background color
                 customPorts    - custom view port params in form of tuple( x0,y0,x1,y1 ) where x and y between (0,1)
                 customBackgrounds  - custom backgrounds for each of the view port
+                maxFps         - cap renders of this controller with own scheduler
+                scheduler      - render scheduler, shared one by default
+                profile        - time renders, reported to OnStageTimings callback (enabled by it too)
         """
+        self.scheduler = scheduler or (RenderScheduler(maxFps) if maxFps else SCHEDULER)
         self.bgColor = bgColor or (0.25, 0.25, 0.25)
         self.callbacks = callbacks or {}
+        self.timings = StageTimings() if profile or 'OnStageTimings' in self.callbacks else None
         self.numOfRenderers = numOfRenderers if numOfRenderers > 0 else 1
         self.customPorts = customPorts or {0: (0.0, 0.0, 1.0, 1.0), }
         self.customBackgrounds = customBackgrounds or {}
@@ -157,6 +229,19 @@ class VTKRenderController(Atom):
                 ren.ResetCamera()
                 ren.GetActiveCamera().Zoom(self.zoomFactor)
 
+    def requestRender(self, view=None):
+        """ request coalesced render of the view, controller view by default """
+        if self.timings:
+            self.scheduler.request(view or self.view, self.timings, self._fireTimings)
+        else:
+            self.scheduler.request(view or self.view)
+
+    def _fireTimings(self):
+        """ report render timings to OnStageTimings callback """
+        fn = self.callbacks.get('OnStageTimings')
+        if fn and callable(fn):
+            fn(self.timings.summary())
+
     def get_renderers(self):
         """ return current renderers """
         return self.renderers
@@ -0,0 +1,96 @@
+"""
+Stage timings - opt-in wall time and resident memory change of named pipeline stages
+"""
+
+import sys
+import time
+import resource
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+# collectors of active stage_timings() blocks
+_active = []
+
+# current resident memory source, linux only
+STATM = '/proc/self/statm'
+PAGE_MB = resource.getpagesize() / (1024. * 1024.)
+
+# ru_maxrss is in bytes on mac os, kilobytes elsewhere
+MAXRSS_MB = 1024. * 1024. if sys.platform == 'darwin' else 1024.
+
+
+def maxrss():
+    """ peak resident memory of current process in MB """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / MAXRSS_MB
+
+
+def rss():
+    """
+    current resident memory of process in MB - peak resident memory where /proc is not available (non linux),
+    which only grows, so stages running below earlier peak show no change there
+    """
+    try:
+        with open(STATM) as f:
+            return int(f.read().split()[1]) * PAGE_MB
+    except (IOError, OSError, ValueError, IndexError):
+        return maxrss()
+
+
+class StageTimings(object):
+    """
+    per stage calls, total, max and last wall time in seconds and rssDelta, summed change of resident memory
+    in MB over stage runs - not allocation counts, memory freed or reused inside stage is not seen, without
+    /proc (non linux) it is growth of peak resident memory only
+    """
+
+    def __init__(self):
+        """ default init """
+        self.stages = OrderedDict()
+
+    def record(self, name, seconds, rssDelta=0.):
+        """ add stage run """
+        s = self.stages.setdefault(name, {'calls': 0, 'total': 0., 'max': 0., 'last': 0., 'rssDelta': 0.})
+        s['calls'] += 1
+        s['total'] += seconds
+        s['max'] = max(s['max'], seconds)
+        s['last'] = seconds
+        s['rssDelta'] += rssDelta
+
+    def clear(self):
+        """ drop all stages """
+        self.stages = OrderedDict()
+
+    def summary(self):
+        """ copy of stages in order of first run """
+        return OrderedDict((name, dict(s)) for name, s in self.stages.iteritems())
+
+
+@contextmanager
+def stage(name, timings=None):
+    """ time block as named stage into given timings and all active collectors, no-op when none """
+    collectors = _active + [timings] if timings is not None else _active
+    if not collectors:
+        yield
+        return
+
+    start = time.time()
+    before = rss()
+    try:
+        yield
+    finally:
+        seconds = time.time() - start
+        change = rss() - before
+        for collector in collectors:
+            collector.record(name, seconds, change)
+
+
+@contextmanager
+def stage_timings():
+    """ collect stages of all surfaces and renders run inside the block """
+    timings = StageTimings()
+    _active.append(timings)
+    try:
+        yield timings
+    finally:
+        _active.remove(timings)
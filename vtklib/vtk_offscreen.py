@@ -0,0 +1,158 @@
+"""
+Offscreen surface rendering - headless batch snapshots without Qt or Enaml,
+needs vtk built with OSMesa or EGL (VTK_OPENGL_HAS_OSMESA / VTK_OPENGL_HAS_EGL) on machines without display
+"""
+
+import os
+import logging
+import multiprocessing
+import vtk
+import colors
+import datasources
+from vtk.util import numpy_support
+from vtk_surface import VTKSurface3D, colorAsFloatValues
+
+
+# default snapshot size
+SNAPSHOT_SIZE = (800, 600)
+
+# offscreen renderer of snapshot farm worker process
+_worker = None
+
+
+class VTKOffscreenRenderer(object):
+    """
+    offscreen surface renderer - one render window, renderer, surface pipeline and png writer are reused
+    for all frames, data of the same shape is updated in place
+    """
+
+    def __init__(self, size=SNAPSHOT_SIZE, bgColor=None, **kwargs):
+        """
+        default init
+            size     - snapshot size in pixels
+            bgColor  - background color, float values
+            kwargs   - surface properties used for every frame
+        """
+        self.properties = kwargs
+        self.surface = None
+
+        self.renderer = vtk.vtkRenderer()
+        self.renderer.SetBackground(bgColor or colorAsFloatValues(colors.GRAY))
+
+        self.window = vtk.vtkRenderWindow()
+        self.window.SetOffScreenRendering(1)
+        self.window.SetSize(*size)
+        self.window.AddRenderer(self.renderer)
+
+        self.image = vtk.vtkWindowToImageFilter()
+        self.image.SetInput(self.window)
+        self.image.SetInputBufferTypeToRGBA()
+        self.image.ReadFrontBufferOff()
+
+        self.writer = vtk.vtkPNGWriter()
+        self.writer.SetInputConnection(self.image.GetOutputPort())
+
+    def renderSurface(self, data, **properties):
+        """ render surface of data - pipeline of previous frame is reused when shape and options match """
+        args = dict(self.properties, **properties)
+
+        if self.surface is None:
+            self.surface = VTKSurface3D(data, renderer=self.renderer, **args)
+        else:
+            self.surface.SetValue(data, **args)
+
+        if not self.surface.hasData:
+            return False
+
+        self.surface.calculatePositions()
+        self.surface.setDefaultView()
+        self.window.Render()
+
+        return True
+
+    def snapshot(self, path=None):
+        """ write current frame as png file, returns path or png bytes when no path given """
+        self.image.Modified()
+
+        if path:
+            self.writer.WriteToMemoryOff()
+            self.writer.SetFileName(path)
+            self.writer.Write()
+            return path
+
+        self.writer.WriteToMemoryOn()
+        self.writer.Write()
+        return numpy_support.vtk_to_numpy(self.writer.GetResult()).tostring()
+
+    def render(self, data, path=None, **properties):
+        """ render data and take snapshot, returns path, png bytes or None on failure """
+        if not self.renderSurface(data, **properties):
+            logging.error('No surface rendered for %s', path)
+            return None
+
+        return self.snapshot(path)
+
+    def renderBatch(self, datasets, paths=None, **properties):
+        """ render datasets one by one, returns list of paths or png bytes """
+        paths = paths or [None] * len(datasets)
+        return [self.render(data, path, **properties) for data, path in zip(datasets, paths)]
+
+    def close(self):
+        """ release render window """
+        if self.surface:
+            self.surface.clear()
+        self.window.Finalize()
+
+
+def snapshot_paths(count, directory='.', pattern='surface_%05d.png'):
+    """ numbered snapshot file names """
+    return [os.path.join(directory, pattern % i) for i in xrange(count)]
+
+
+def render_batch(datasets, directory=None, pattern='surface_%05d.png', size=SNAPSHOT_SIZE, **properties):
+    """
+    render list of datasets offscreen
+        directory - write png files there and return their paths, otherwise return png bytes
+        properties - surface properties, same as VTKSurface3D
+    """
+    renderer = VTKOffscreenRenderer(size=size, **properties)
+    try:
+        paths = snapshot_paths(len(datasets), directory, pattern) if directory else None
+        return renderer.renderBatch(datasets, paths)
+    finally:
+        renderer.close()
+
+
+def _initWorker(size, properties):
+    """ create offscreen context of worker process once, reused for all its tasks """
+    global _worker
+    _worker = VTKOffscreenRenderer(size=size, **properties)
+
+
+def _renderTask(task):
+    """ render one dataset in worker process """
+    data, path = task
+    if isinstance(data, basestring):
+        data = datasources.load_mapped_surface(data)
+    return _worker.render(data, path)
+
+
+def render_parallel(datasets, directory=None, pattern='surface_%05d.png', size=SNAPSHOT_SIZE, processes=None,
+                    chunksize=1, **properties):
+    """
+    render datasets across process pool - each worker holds own offscreen window and reused pipeline,
+    yields png paths (directory given) or png bytes in datasets order as they are done
+        datasets   - surface data or paths saved by datasources.save_mapped_surface, mapped by worker
+                     instead of being pickled
+        processes  - number of workers, cpu count by default
+        properties - surface properties, same as VTKSurface3D
+    """
+    paths = snapshot_paths(len(datasets), directory, pattern) if directory else [None] * len(datasets)
+    pool = multiprocessing.Pool(processes, _initWorker, (size, properties))
+    try:
+        for result in pool.imap(_renderTask, zip(datasets, paths), chunksize):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
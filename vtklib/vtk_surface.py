@@ -7,8 +7,9 @@ import math
 import numpy
 import vtk
 import logging
-import functools32 as func
 import colors
+from timings import StageTimings, stage
+from vtk.util import numpy_support
 
 
 logging.basicConfig(format='%(asctime)s: %(levelname)s: %(message)s', level=logging.DEBUG)
@@ -41,6 +42,348 @@ def calcStep(step):
     return final_step
 
 
+# grid rows (points of one y) filled at once when fill progress is reported
+FILL_ROWS = 128
+
+
+def fillGridPoints(points, vx, vy, vz, chunk=None):
+    """
+    fill structured grid points array in place - x index runs fastest as vtk expects,
+    chunk is called with rows done and all rows after every FILL_ROWS rows when given
+    """
+    grid = points.reshape(vy.size, vx.size, 3)
+    rows = FILL_ROWS if chunk else vy.size
+    for j in xrange(0, vy.size, rows):
+        block = grid[j:j + rows]
+        block[:, :, 0] = vx[numpy.newaxis, :]
+        block[:, :, 1] = vy[j:j + rows, numpy.newaxis]
+        block[:, :, 2] = vz[:, j:j + rows].transpose()
+        if chunk:
+            chunk(min(j + rows, vy.size), vy.size)
+    return points
+
+
+def gridPoints(vx, vy, vz, chunk=None):
+    """ build structured grid points array """
+    return fillGridPoints(numpy.empty((vx.size * vy.size, 3), dtype=numpy.float32), vx, vy, vz, chunk)
+
+
+def fillGridScalars(scalars, values, chunk=None):
+    """
+    fill flat scalars array in place from (x, y) matrix in structured grid point order,
+    chunk is called with rows done and all rows after every FILL_ROWS rows when given
+    """
+    grid = scalars.reshape(values.shape[1], values.shape[0])
+    rows = FILL_ROWS if chunk else values.shape[1]
+    for j in xrange(0, values.shape[1], rows):
+        grid[j:j + rows] = values[:, j:j + rows].transpose()
+        if chunk:
+            chunk(min(j + rows, values.shape[1]), values.shape[1])
+    return scalars
+
+
+def gridScalars(values, dtype=numpy.float32, chunk=None):
+    """ flatten (x, y) matrix into structured grid point order """
+    return fillGridScalars(numpy.empty(values.size, dtype=dtype), values, chunk)
+
+
+def gridValues(values, dtype=None, chunk=None):
+    """
+    flatten (x, y) matrix into grid point order - fortran ordered float matrix of requested precision
+    is viewed, not copied
+    """
+    if values.flags.f_contiguous and (values.dtype == dtype if dtype else values.dtype in PRECISIONS.values()):
+        return values.ravel(order='F')
+    return gridScalars(values, dtype or numpy.float32, chunk)
+
+
+# allowed deviation of uniform grid axis steps, as fraction of step
+UNIFORM_TOLERANCE = 1e-4
+
+
+def isUniform(coords, tolerance=UNIFORM_TOLERANCE):
+    """ ascending axis coordinates with constant step, deviation within tolerance fraction of step """
+    if not isinstance(coords, numpy.ndarray) or coords.size < 2:
+        return False
+    step = (float(coords[-1]) - float(coords[0])) / (coords.size - 1)
+    return step > 0 and numpy.abs(numpy.diff(coords) - step).max() <= tolerance * step
+
+
+def gridOptions(vx, vy, vz, kwargs):
+    """
+    pick grid type when gridData is not given - uniformly spaced axes are mapped onto image data and
+    memory mapped Z onto rectilinear grid, both warp wrapped Z scalars, otherwise structured grid is kept
+    """
+    if 'gridData' in kwargs:
+        return kwargs
+
+    if kwargs.get('imageData', True) and isUniform(vx) and isUniform(vy):
+        kwargs['gridData'] = False
+        kwargs['imageData'] = True
+    elif isinstance(vz, numpy.memmap):
+        kwargs['gridData'] = False
+
+    return kwargs
+
+
+def gridArgs(args):
+    """ grid type options, picked from data by gridOptions when not given """
+    return dict((k, args[k]) for k in GRID_ARGS if k in args)
+
+
+def asPrecision(values, dtype):
+    """ values as array of given float type keeping memory layout, no copy when already of that type """
+    if dtype is None or not isinstance(values, numpy.ndarray):
+        return values
+    return values.astype(dtype, copy=False)
+
+
+def invalidMask(vz, mv=None):
+    """ (x, y) matrix of points with missing z or v values, None when all values are valid """
+    mask = ~numpy.isfinite(vz)
+    if mv is not None:
+        mask |= ~numpy.isfinite(mv)
+    return mask if mask.any() else None
+
+
+def cellMask(mask):
+    """ (x - 1, y - 1) matrix of cells touching any masked point """
+    return mask[:-1, :-1] | mask[1:, :-1] | mask[:-1, 1:] | mask[1:, 1:]
+
+
+def ghostArray(mask, flag):
+    """ vtk ghost array flagging masked entries of (x, y) matrix in grid order """
+    ghosts = numpy.where(mask.ravel(order='F'), flag, 0).astype(numpy.uint8)
+    array = numpy_support.numpy_to_vtk(ghosts, deep=True, array_type=vtk.VTK_UNSIGNED_CHAR)
+    array.SetName(vtk.vtkDataSetAttributes.GhostArrayName())
+    return array
+
+
+def sameMask(mask, other):
+    """ masks are both empty or equal """
+    if mask is None or other is None:
+        return mask is other
+    return mask.shape == other.shape and numpy.array_equal(mask, other)
+
+
+def sameValue(value, other):
+    """ option values are equal - arrays, also inside lists and tuples, are compared element wise """
+    if isinstance(value, numpy.ndarray) or isinstance(other, numpy.ndarray):
+        return numpy.array_equal(value, other)
+    if isinstance(value, (list, tuple)) and isinstance(other, (list, tuple)):
+        return len(value) == len(other) and all(sameValue(a, b) for a, b in zip(value, other))
+    try:
+        return bool(value == other)
+    except ValueError:
+        # ambiguous comparison, e.g. dict holding arrays - treated as changed
+        return False
+
+
+def sameOptions(args, other):
+    """ option dicts have same keys and equal values """
+    return set(args) == set(other) and all(sameValue(args[k], other[k]) for k in args)
+
+
+def rowRanges(rows):
+    """ per row min and max ignoring missing values, nan for rows without values """
+    return numpy.fmin.reduce(rows, axis=1), numpy.fmax.reduce(rows, axis=1)
+
+
+class RangeTracker(object):
+    """
+    min and max of matrix kept from its per row ranges - written rows are rescanned alone and overall range is
+    reduced from row ranges again only when row holding previous extreme is overwritten, missing values ignored
+    """
+
+    def __init__(self, rows):
+        """ default init - full scan of rows """
+        self.reset(rows)
+
+    def reset(self, rows):
+        """ full rescan after whole matrix is written """
+        self.mins, self.maxs = rowRanges(rows)
+        self.min, self.max = numpy.fmin.reduce(self.mins), numpy.fmax.reduce(self.maxs)
+
+    def update(self, index, rows):
+        """ rows written at index - row or slice of rows """
+        rows = numpy.asarray(rows)
+        if rows.ndim == 1:
+            rows = rows[numpy.newaxis]
+        mins, maxs = rowRanges(rows)
+        lo, hi = numpy.fmin.reduce(mins), numpy.fmax.reduce(maxs)
+
+        dropped = ((numpy.any(self.mins[index] == self.min) and not lo <= self.min) or
+                   (numpy.any(self.maxs[index] == self.max) and not hi >= self.max))
+
+        self.mins[index] = mins if isinstance(index, slice) else mins[0]
+        self.maxs[index] = maxs if isinstance(index, slice) else maxs[0]
+
+        if dropped:
+            self.min, self.max = numpy.fmin.reduce(self.mins), numpy.fmax.reduce(self.maxs)
+        else:
+            self.min, self.max = numpy.fmin(self.min, lo), numpy.fmax(self.max, hi)
+
+    def range(self, dtype=None):
+        """ (min, max), as values of given precision when scalars are stored in it """
+        if dtype is None:
+            return self.min, self.max
+        return float(dtype(self.min)), float(dtype(self.max))
+
+
+def sliceWeights(coords, position):
+    """ neighbouring indexes and linear weight of position on monotonic axis coordinates """
+    n = coords.size
+    if n == 1:
+        return 0, 0, 0.0
+
+    descending = coords[0] > coords[-1]
+    c = coords[::-1] if descending else coords
+
+    hi = int(min(max(numpy.searchsorted(c, position, side='right'), 1), n - 1))
+    lo = hi - 1
+    span = float(c[hi] - c[lo])
+    t = min(max((position - c[lo]) / span, 0.0), 1.0) if span else 0.0
+
+    if descending:
+        lo, hi = n - 1 - lo, n - 1 - hi
+
+    return lo, hi, t
+
+
+def sliceProfile(coords, along, values, position, columns=False):
+    """
+    (along, z) profile of values matrix cut at position of first axis, linear interpolation between
+    neighbouring rows - (n, 2) array sorted by along coordinate or (along, z) columns tuple
+    """
+    lo, hi, t = sliceWeights(coords, position)
+
+    if t == 0:
+        z = numpy.asarray(values[lo], dtype=numpy.float64)
+    elif t == 1:
+        z = numpy.asarray(values[hi], dtype=numpy.float64)
+    else:
+        z = values[lo] * (1 - t) + values[hi] * t
+
+    profile = numpy.column_stack((along, z))
+    if along.size > 1 and along[0] > along[-1]:
+        profile = profile[::-1]
+
+    if columns:
+        return profile[:, 0], profile[:, 1]
+
+    return profile
+
+
+# surface scalar precisions, vtk geometry filters keep points in float32 regardless
+PRECISIONS = {'float32': numpy.float32, 'float64': numpy.float64}
+
+# level of detail sample rates and minimal decimated grid size
+LOD_LEVELS = (2, 4, 8)
+LOD_MIN_SIZE = 16
+
+# arguments that do not affect the surface pipeline layout
+DATA_ARGS = ('parent', 'renderer', 'config', 'callbacks', 'appName', 'logToFile', 'doRender', 'inPlace', 'remapData',
+             'shared')
+
+# grid type arguments, picked from data when not given
+GRID_ARGS = ('gridData', 'imageData')
+
+# data stage built by render_geometry, taken over from background preparation
+DATA_ATTRS = ('hasData', 'gridData', 'imageData', 'gridfunc', 'Points', 'Colors', 'PointsData', 'ColorsData', 'Heights',
+              'HeightsData', 'Mask', 'XValues', 'YValues', 'ZValues', 'VValues', 'XLimit', 'YLimit', 'ZLimit',
+              'XScale', 'YScale', 'ZScale', 'ZTracker', 'VTracker')
+
+# data stage and surface pipeline taken over from shared surface
+SHARED_ATTRS = DATA_ATTRS + ('out', 'transform', 'warp', 'mapper', 'lodMappers', 'lodWarps', 'ring', 'geometry',
+                             'lodExtracts')
+
+# background preparation stages reported to progress callback
+PREPARE_STAGES = ('conversion', 'arrays')
+
+
+class RollingWindow(object):
+    """
+    rolling window of surface rows along one axis (0 - x rows, 1 - y columns) - ring buffer where every row is
+    written twice, capacity rows apart, so the last length rows are always one contiguous slice of buffers that
+    vtk arrays wrap directly, appending a row touches only that row
+    """
+
+    def __init__(self, axis, capacity, coords, vz, mv=None, dtype=numpy.float32):
+        """ default init - window starts with last capacity rows of coords and Z (and V) matrices """
+        self.axis = axis
+        self.capacity = capacity
+        self.start = 0
+        self.length = min(coords.size, capacity)
+
+        self.coords = self._allocate(coords[:, numpy.newaxis], numpy.float64)[1][:, 0]
+        self.Z, self.zrows = self._allocate(vz if axis == 0 else vz.T, dtype)
+        self.ztracker = RangeTracker(self.zrows[:capacity])
+
+        self.V = self.vrows = self.vtracker = None
+        if mv is not None:
+            self.V, self.vrows = self._allocate(mv if axis == 0 else mv.T, dtype)
+            self.vtracker = RangeTracker(self.vrows[:capacity])
+
+    def _allocate(self, rows, dtype):
+        """ fortran ordered buffer of rows and its view with ring rows first, stale rows repeat last row """
+        n, m = self.length, rows.shape[1]
+        shape = (2 * self.capacity, m) if self.axis == 0 else (m, 2 * self.capacity)
+        buf = numpy.empty(shape, dtype=dtype, order='F')
+        ring = buf if self.axis == 0 else buf.T
+
+        tail = rows[-n:]
+        for offset in (0, self.capacity):
+            ring[offset:offset + n] = tail
+            ring[offset + n:offset + self.capacity] = tail[-1]
+
+        return buf, ring
+
+    def append(self, coord, z, v=None):
+        """ write row after window end, oldest row drops out of full window, returns buffer index of row """
+        index = (self.start + self.length) % self.capacity
+
+        for i in (index, index + self.capacity):
+            self.coords[i] = coord
+            self.zrows[i] = z
+            if self.vrows is not None:
+                self.vrows[i] = v
+
+        self.ztracker.update(index, self.zrows[index])
+        if self.vtracker:
+            self.vtracker.update(index, self.vrows[index])
+
+        if self.length < self.capacity:
+            self.length += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+        return index
+
+    def window(self):
+        """ buffer slice of window rows, oldest first """
+        return slice(self.start, self.start + self.length)
+
+    def extent(self):
+        """ grid extent of window """
+        first, last = self.start, self.start + self.length - 1
+        size = self.zrows.shape[1] - 1
+        if self.axis == 0:
+            return first, last, 0, size, 0, 0
+        return 0, size, first, last, 0, 0
+
+    def coordsRange(self):
+        """ window range of appended axis, coordinates are monotonic """
+        first, last = self.coords[self.start], self.coords[self.start + self.length - 1]
+        return min(first, last), max(first, last)
+
+    def invalid(self, index):
+        """ missing values of buffer row """
+        invalid = ~numpy.isfinite(self.zrows[index])
+        if self.vrows is not None:
+            invalid |= ~numpy.isfinite(self.vrows[index])
+        return invalid
+
+
 class VTKSurfaceConfig(object):
     """ VTK Canvas configurations  """
 
@@ -105,7 +448,7 @@ class VTKSurfaceConfig(object):
         return self._nLabels
 
     def LookupTables(self):
-        """ get lookup tables """
+        """ get lookup tables - shared by all configs, must not be modified """
         return self._lookupTables
 
     def ColorMaps(self):
@@ -124,8 +467,16 @@ def getColorMaps():
     return config.ColorMaps()
 
 
+def isColumnar(data):
+    """ check for columnar (x, y, Z[, V]) input - x, y vectors with Z and optional V matrices """
+    if not isinstance(data, (list, tuple)) or len(data) not in (3, 4):
+        return False
+
+    return all(isinstance(d, numpy.ndarray) for d in data[:3]) and data[2].ndim == 2
+
+
 def remap(data):
-    """ simple remapping - take x and y as natural indexes from 2D numpy array """
+    """ simple remapping - take x and y as natural indexes from 2D numpy array, returns columnar data """
     if isinstance(data, (list, tuple)):
         return data
 
@@ -134,15 +485,28 @@ def remap(data):
     if ndim != 2 and len(shape) != 2:
         return []
 
-    return [(x, [(y, data[x, y]) for y in xrange(0, shape[1])]) for x in xrange(0, shape[0])]
+    return numpy.arange(shape[0]), numpy.arange(shape[1]), data
 
 
-def convertData(x_yzv_pairs, **kwargs):
-    """ convert x_yzv value pars to vtk compatible data """
+def convertData(x_yzv_pairs, chunk=None, **kwargs):
+    """
+    convert x_yzv value pars or columnar (x, y, Z[, V]) data to vtk compatible data,
+    Z and V are converted to precision ('float32' or 'float64') when given,
+    chunk is called with pairs done and all pairs after every FILL_ROWS pairs when given
+    """
 
     if x_yzv_pairs is None:
         return [], [], [], []
 
+    dtype = PRECISIONS.get(kwargs.get('precision'))
+
+    if isColumnar(x_yzv_pairs):
+        x, y, z = x_yzv_pairs[:3]
+        v = x_yzv_pairs[3] if len(x_yzv_pairs) == 4 else None
+        if v is None:
+            v = []
+        return x, y, asPrecision(z, dtype), asPrecision(v, dtype)
+
     x = []
     y = []
     z = []
@@ -166,23 +530,76 @@ def convertData(x_yzv_pairs, **kwargs):
             if hasV:
                 v.append(yzv[2])
         row += 1
+        if chunk and (row % FILL_ROWS == 0 or row == len(x_yzv_pairs)):
+            chunk(row, len(x_yzv_pairs))
 
     x = numpy.array(x)
     y = numpy.array(y)
-    z = numpy.array(z).reshape(x.size, y.size)
+    z = numpy.array(z, dtype=dtype).reshape(x.size, y.size)
     if v:
-        v = numpy.array(v).reshape(x.size, y.size)
+        v = numpy.array(v, dtype=dtype).reshape(x.size, y.size)
 
     return x, y, z, v
 
 
+class PrepareCancelled(Exception):
+    """ background preparation was cancelled during conversion or array fill """
+
+
+def prepareSurface(x_yzv_pairs, progress=None, cancelled=None, **kwargs):
+    """
+    convert data and build vtk grid arrays away from gui thread - no renderer, actors or callbacks are touched,
+    returns data stage for VTKSurface3D.applyData, None when cancelled or data is invalid
+        progress  - called with stage name and fraction done, 'ready' at 1.0
+        cancelled - returns True when preparation should stop, checked between stages and every FILL_ROWS
+                    rows of pairs conversion and array fill, columnar data is converted at once
+    """
+    args = dict(kwargs)
+    surface = VTKSurface3D(None, renderer=None, doRender=False, profile=args.get('profile', False))
+
+    for i, name in enumerate(PREPARE_STAGES):
+        if cancelled and cancelled():
+            return None
+        if progress:
+            progress(name, float(i) / len(PREPARE_STAGES))
+
+        def filled(fraction, i=i, name=name):
+            if cancelled and cancelled():
+                raise PrepareCancelled()
+            if progress:
+                progress(name, (i + fraction) / len(PREPARE_STAGES))
+
+        surface.fillCallback = filled
+        try:
+            if name == 'conversion':
+                (x, y, z, v) = surface.convertSurface(x_yzv_pairs, **args)
+                gridOptions(x, y, z, args)
+            elif not surface.render_geometry(x, y, z, v, **args):
+                return None
+        except PrepareCancelled:
+            return None
+        finally:
+            surface.fillCallback = None
+
+    if cancelled and cancelled():
+        return None
+    if progress:
+        progress('ready', 1.0)
+
+    surface.renderArgs = args
+    return surface
+
+
 class VTKSurface3D(object):
     def __init__(self, x_yzv_pairs, **kwargs):
         """
         default init
+            x_yzv_pairs - list of (x, [(y, z[, v]), ...]) pairs or columnar (x, y, Z[, V]) numpy data
+            shared      - surface of other renderer to share data and pipeline with, x_yzv_pairs is ignored
         """
         self.reset()
         self.kwargs = kwargs
+        self.shared = kwargs.get('shared', None)
         self.parent = kwargs.get('parent', None)
         self.bgColor = kwargs.get('bgColor', colors.GRAY)
         self.fgColor = colorAsFloatValues(kwargs.get('fgColor', colors.WHITE))
@@ -201,6 +618,8 @@ class VTKSurface3D(object):
         self.fontFactor = kwargs.get('fontFactor', 0.75)
         self.opacitySlice = kwargs.get('opacitySlice', 0.55)
         self.callbacks = copy.copy(kwargs.get('callbacks', {}))
+        self.timings = StageTimings() if kwargs.get('profile', False) or 'OnStageTimings' in self.callbacks else None
+        self.fillCallback = None
         self.logToFile = kwargs.get('logToFile', False)
         self.renderer = kwargs.get('renderer', None)
         self.doRender = kwargs.get('doRender', True)
@@ -212,7 +631,7 @@ class VTKSurface3D(object):
         self.warp = None
         self.colorbar = None
 
-        if self.renderer is None:
+        if self.renderer is None and self.doRender:
             raise Exception('No renderer defined ')
 
         if self.logToFile:
@@ -226,12 +645,52 @@ class VTKSurface3D(object):
 
     def SetValue(self, x_yzv_pairs, **kwargs):
         self.config = kwargs.get('config', VTKSurfaceConfig())
+        converted = None
+        if self.shared:
+            # shared surface is updated first, follow it in place when its pipeline and own view options are kept,
+            # views are rebuilt with new options otherwise
+            if self.mapper and self.mapper is self.shared.mapper and sameOptions(
+                    self._renderOptions(kwargs), self._renderOptions(self.renderArgs)):
+                self.sync_shared()
+                return
+        elif kwargs.get('inPlace', True) and self.canUpdate(kwargs):
+            # data is converted once, rebuild takes it over when it does not fit in place
+            converted = self.convertSurface(x_yzv_pairs, **kwargs)
+            if self.update_surface(converted, **kwargs):
+                return
         self.clear()
-        self.render_surface(x_yzv_pairs, **kwargs)
+        self.render_surface(x_yzv_pairs, converted, **kwargs)
         if self.hasData:
             self.calculatePositions()
             self.setDefaultView()
 
+    def applyData(self, prepared):
+        """
+        swap in data stage built by prepareSurface - only pipeline and actors are made here, on gui thread,
+        shared surfaces take it from their shared surface, which is applied first
+        """
+        self.clear()
+        if self.shared:
+            self.render_surface(None, **prepared.renderArgs)
+        else:
+            self.reset()
+            if self.timings:
+                self.timings.clear()
+                if prepared.timings:
+                    self.timings.stages.update(prepared.timings.summary())
+            for name in DATA_ATTRS:
+                setattr(self, name, getattr(prepared, name))
+            if self.hasData:
+                self.fireCallbacks(callback='OnDataRange')
+                self.render(**prepared.renderArgs)
+                self.fireTimings()
+
+        if self.hasData:
+            self.calculatePositions()
+            self.setDefaultView()
+
+        return self.hasData
+
     def fireCallbacks(self, callback=None):
         callFunc = self.callbacks.get(callback, None)
         if callFunc and callable(callFunc):
@@ -239,6 +698,8 @@ class VTKSurface3D(object):
                 callFunc(self.getDataRanges())
             if callback == 'OnCutterDataSet':
                 callFunc(self.getCutterData())
+            if callback == 'OnStageTimings' and self.timings:
+                callFunc(self.timings.summary())
         else:
             for callback, callFunc in self.callbacks.iteritems():
                 if callback == 'OnDataRange' and callable(callFunc):
@@ -246,6 +707,11 @@ class VTKSurface3D(object):
                 if callback == 'OnCutterDataSet' and callable(callFunc):
                     callFunc(self.getCutterData())
 
+    def fireTimings(self):
+        """ report stage timings of last build or update """
+        if self.timings and 'OnStageTimings' in self.callbacks:
+            self.fireCallbacks(callback='OnStageTimings')
+
     def redraw( self ):
         """ invalidate graph """
         if self.parent:
@@ -263,15 +729,296 @@ class VTKSurface3D(object):
         """ get current modeled actors """
         return self.actors
 
-    def render_surface(self, x_yzv_pairs, **kwargs):
-        """ render surface with data """
+    def render_surface(self, x_yzv_pairs, converted=None, **kwargs):
+        """
+        render surface with data
+            converted - (x, y, z, v) data already made by convertSurface, x_yzv_pairs is not converted again
+        """
         self.reset()
-        doRemap = kwargs.get('remapData', False)
-        if doRemap:
-            x_yzv_pairs = remap( x_yzv_pairs )
-        (x, y, z, v) = convertData(x_yzv_pairs, **kwargs)
+        if self.shared:
+            # data and pipeline come from shared surface, only views are built here
+            if self.timings:
+                self.timings.clear()
+            self._shareData(self.shared)
+            if self.hasData:
+                self.render(**kwargs)
+                self.fireTimings()
+            return
+        (x, y, z, v) = converted or self.convertSurface(x_yzv_pairs, **kwargs)
+        gridOptions(x, y, z, kwargs)
         if self.render_geometry(x, y, z, v, **kwargs):
             self.render(**kwargs)
+            self.fireTimings()
+
+    def convertSurface(self, x_yzv_pairs, **kwargs):
+        """ remap and convert input data to (x, y, z, v) - starts timings of new build or update """
+        if self.timings:
+            self.timings.clear()
+
+        with stage('conversion', self.timings):
+            if kwargs.get('remapData', False):
+                x_yzv_pairs = remap(x_yzv_pairs)
+            return convertData(x_yzv_pairs, self._fillChunks(0, 1), **kwargs)
+
+    def canUpdate(self, kwargs):
+        """
+        surface may be updated in place - surface is built and render options are unchanged, grid type picked
+        from data is checked by update_surface once data is converted
+        """
+        if not self.hasData or not self.mapper or self.ColorsData is None or self.ring:
+            return False
+
+        return sameOptions(self._renderOptions(kwargs, GRID_ARGS), self._renderOptions(self.renderArgs, GRID_ARGS))
+
+    def update_surface(self, converted, **kwargs):
+        """
+        overwrite current surface data in place with (x, y, z, v) data made by convertSurface - only when
+        canUpdate and grid type and shape are unchanged, keeps pipeline, actors, cameras and cutters,
+        returns False when full rebuild is required
+        """
+        (vx, vy, vz, mv) = converted
+        gridOptions(vx, vy, vz, kwargs)
+
+        if not sameOptions(gridArgs(kwargs), gridArgs(self.renderArgs)):
+            return False
+
+        if not self._validateData(vx, vy, vz, mv):
+            return False
+
+        mva = isinstance(mv, numpy.ndarray) and mv.any()
+        if vz.shape != self.ZValues.shape or mva != (self.VValues is not None):
+            return False
+
+        with stage('array_fill', self.timings):
+            if self.gridData:
+                fillGridPoints(self.PointsData, vx, vy, vz)
+                fillGridScalars(self.ColorsData, mv if mva else vz)
+                self.Points.Modified()
+            else:
+                self._updateRectilinear(vx, vy, vz, mv if mva else None)
+
+        self._trackRanges(vz, mv if mva else None)
+
+        if self.renderArgs.get('maskInvalid', False):
+            with stage('mask', self.timings):
+                self._maskInvalid(invalidMask(vz, mv if mva else None))
+
+        self.Colors.Modified()
+        self.gridfunc.Modified()
+
+        self._setData(vx, vy, vz, mv if mva else None)
+        self._dataChanged()
+        return True
+
+    def _dataChanged(self):
+        """ follow in place data change - limits, scales, scalar range, placements, callbacks and redraw """
+        self._calculateLimits()
+
+        self.transform.Identity()
+        self.transform.Scale(*self._transformScale(**self.renderArgs))
+        self.warp.SetScaleFactor(self._warpScale())
+        for warp in self.lodWarps:
+            warp.SetScaleFactor(self.warp.GetScaleFactor())
+        self._applyScalarRange()
+
+        self.invalidateGeometry()
+        bounds = self.getBounds()
+        self._updatePlacements(bounds)
+
+        if self.timings:
+            # pipeline runs on next render otherwise
+            with stage('mapper', self.timings):
+                self.mapper.Update()
+
+        if self.hasData:
+            self.fireCallbacks(callback='OnDataRange')
+            self.fireTimings()
+
+        self.redraw()
+
+    def _placeImage(self, vx, vy):
+        """ image data origin and spacing of uniformly spaced axes """
+        self.gridfunc.SetOrigin(vx[0], vy[0], 0)
+        self.gridfunc.SetSpacing((float(vx[-1]) - vx[0]) / (vx.size - 1), (float(vy[-1]) - vy[0]) / (vy.size - 1), 1)
+
+    def _updateRectilinear(self, vx, vy, vz, mv):
+        """
+        refresh rectilinear grid or image data - coordinates are overwritten in place, Z and V matrices are
+        wrapped again instead of copied into previous buffers, which may be read only memory maps
+        """
+        dtype = PRECISIONS.get(self.renderArgs.get('precision'))
+
+        if self.imageData:
+            self._placeImage(vx, vy)
+        else:
+            for coords, values in ((self.gridfunc.GetXCoordinates(), vx), (self.gridfunc.GetYCoordinates(), vy)):
+                numpy_support.vtk_to_numpy(coords)[:] = values
+                coords.Modified()
+
+        self.HeightsData = gridValues(vz, dtype)
+        self.Heights = numpy_support.numpy_to_vtk(self.HeightsData)
+        self.Heights.SetName('Z')
+
+        if mv is not None:
+            self.ColorsData = gridValues(mv, dtype)
+            self.Colors = numpy_support.numpy_to_vtk(self.ColorsData)
+            self.gridfunc.GetPointData().AddArray(self.Heights)
+        else:
+            self.ColorsData = self.HeightsData
+            self.Colors = self.Heights
+
+        self.gridfunc.GetPointData().SetScalars(self.Colors)
+
+    def appendRow(self, x, z, v=None, maxLength=None):
+        """
+        append row of new x value to rolling window surface, oldest row drops out once window holds maxLength
+        rows (current row count by default)
+            z, v - row values along y axis
+        """
+        return self._append(0, x, z, v, maxLength)
+
+    def appendColumn(self, y, z, v=None, maxLength=None):
+        """
+        append column of new y value to rolling window surface, oldest column drops out once window holds
+        maxLength columns (current column count by default)
+            z, v - column values along x axis
+        """
+        return self._append(1, y, z, v, maxLength)
+
+    def _append(self, axis, coord, z, v, maxLength):
+        """ write row into rolling window, window is set up (surface rebuilt) on first append or axis change """
+        if self.shared:
+            # shared surface is appended first
+            if not self.mapper or self.mapper is not self.shared.mapper:
+                self.clear()
+                self.render_surface(None, **self.renderArgs)
+                self.calculatePositions()
+                self.setDefaultView()
+            else:
+                self.sync_shared()
+            return self.hasData
+
+        if not self.hasData or self.ZValues is None:
+            logging.error('No surface data to append to')
+            return False
+
+        size = self.ZValues.shape[1 - axis]
+        z = numpy.asarray(z, dtype=float).ravel()
+        v = numpy.asarray(v, dtype=float).ravel() if v is not None else None
+        if z.size != size or (v is not None and v.size != size):
+            logging.error('Appended values size not match: %s, expected %s', z.size, size)
+            return False
+        if (v is not None) != (self.VValues is not None):
+            logging.error('Appended V values must match surface V values')
+            return False
+
+        if not self.ring or self.ring.axis != axis or (maxLength and maxLength != self.ring.capacity):
+            if not self._makeRing(axis, maxLength or self.ZValues.shape[axis]):
+                return False
+
+        if self.timings:
+            self.timings.clear()
+
+        with stage('array_fill', self.timings):
+            index = self.ring.append(coord, z, v)
+            self._applyWindow()
+            if self.renderArgs.get('maskInvalid', False):
+                self._maskRows(index)
+
+        self._dataChanged()
+        return True
+
+    def _makeRing(self, axis, capacity):
+        """ rebuild surface as rectilinear grid over rolling window buffers """
+        if capacity < 2:
+            logging.error('Rolling window needs at least 2 rows: %s', capacity)
+            return False
+
+        args = dict(self.renderArgs, gridData=False, imageData=False)
+        coords = self.XValues if axis == 0 else self.YValues
+        ring = RollingWindow(axis, capacity, numpy.asarray(coords, dtype=float), self.ZValues, self.VValues,
+                             PRECISIONS.get(args.get('precision')) or numpy.float32)
+        vx, vy = (ring.coords, self.YValues) if axis == 0 else (self.XValues, ring.coords)
+
+        self.clear()
+        self.reset()
+        self.ring = ring
+        if not self.render_geometry(vx, vy, ring.Z, ring.V, **args):
+            return False
+
+        # appended coordinates go straight into vtk coordinates array
+        coordsArray = self.gridfunc.GetXCoordinates() if axis == 0 else self.gridfunc.GetYCoordinates()
+        ring.coords = numpy_support.vtk_to_numpy(coordsArray)
+        if args.get('maskInvalid', False) and self.gridfunc.GetCellData().GetArray(
+                vtk.vtkDataSetAttributes.GhostArrayName()) is None:
+            self.gridfunc.GetCellData().AddArray(ghostArray(numpy.zeros((vx.size - 1, vy.size - 1), bool),
+                                                            vtk.vtkDataSetAttributes.DUPLICATECELL))
+        self.Mask = None
+
+        self._applyWindow()
+        self._calculateLimits()
+        self.render(**args)
+        self.calculatePositions()
+        self.setDefaultView()
+        return True
+
+    def _applyWindow(self):
+        """ point data views and grid extents at current rolling window """
+        w = self.ring.window()
+        if self.ring.axis == 0:
+            self.XValues = self.ring.coords[w]
+            self.ZValues = self.ring.Z[w]
+            self.VValues = self.ring.V[w] if self.ring.V is not None else None
+        else:
+            self.YValues = self.ring.coords[w]
+            self.ZValues = self.ring.Z[:, w]
+            self.VValues = self.ring.V[:, w] if self.ring.V is not None else None
+
+        extent = self.ring.extent()
+        if self.geometry:
+            self.geometry.SetExtent(extent)
+        for extract in self.lodExtracts:
+            extract.SetVOI(extent)
+
+        coordsArray = self.gridfunc.GetXCoordinates() if self.ring.axis == 0 else self.gridfunc.GetYCoordinates()
+        coordsArray.Modified()
+        self.Heights.Modified()
+        self.Colors.Modified()
+        self.gridfunc.Modified()
+
+    def _maskRows(self, index):
+        """ flag cells around written buffer rows, both copies """
+        ghosts = self.gridfunc.GetCellData().GetArray(vtk.vtkDataSetAttributes.GhostArrayName())
+        rows = 2 * self.ring.capacity
+        size = self.ring.zrows.shape[1]
+        cells = numpy_support.vtk_to_numpy(ghosts).reshape((rows - 1, size - 1) if self.ring.axis == 0 else
+                                                           (size - 1, rows - 1), order='F')
+        if self.ring.axis == 1:
+            cells = cells.T
+
+        for i in (index, index + self.ring.capacity):
+            for cell in (i - 1, i):
+                if 0 <= cell < rows - 1:
+                    invalid = self.ring.invalid(cell) | self.ring.invalid(cell + 1)
+                    cells[cell] = numpy.where(invalid[:-1] | invalid[1:], vtk.vtkDataSetAttributes.DUPLICATECELL, 0)
+
+        ghosts.Modified()
+
+    def sync_shared(self):
+        """ follow in place data update of shared surface - replace placements of own views """
+        self._shareData(self.shared)
+        self.invalidateGeometry()
+        self._updatePlacements(self.getBounds())
+        self.redraw()
+
+    def _shareData(self, source):
+        """ take data stage and surface pipeline from source surface """
+        for name in SHARED_ATTRS:
+            setattr(self, name, getattr(source, name))
+
+    def _renderOptions(self, args, exclude=()):
+        """ render options that require full pipeline rebuild when changed, except excluded ones """
+        return dict((k, v) for k, v in args.iteritems() if k not in DATA_ARGS and k not in exclude)
 
     def re_render_surface(self):
         """ re render the surface """
@@ -290,8 +1037,8 @@ class VTKSurface3D(object):
 
     def calculatePositions(self):
         """ calcualte position """
-        self.bounds = self.mapper.GetBounds()
-        self.center = self.mapper.GetCenter()
+        self.bounds = self.getBounds()
+        self.center = self.getCenter()
 
         xx = max(self.bounds[1] - self.center[0], self.center[0] - self.bounds[0])
         yy = max(self.bounds[3] - self.center[1], self.center[1] - self.bounds[2])
@@ -383,10 +1130,33 @@ class VTKSurface3D(object):
         self.YLimit = (0, 0)
         self.ZLimit = (0, 0)
         self.hasData = False
+        self.gridData = True
+        self.imageData = False
         self.gridfunc = None
         self.mapper = None
+        self.transform = None
+        self.lodMappers = []
+        self.lodWarps = []
+        self.lodExtracts = []
+        self.geometry = None
+        self.ring = None
+        self.axes = None
+        self.gridAxes = None
+        self.planeTransform = None
+        self.renderArgs = {}
         self.Points = None
         self.Colors = None
+        self.PointsData = None
+        self.ColorsData = None
+        self.Heights = None
+        self.HeightsData = None
+        self.Mask = None
+        self.ZTracker = None
+        self.VTracker = None
+        self.XValues = None
+        self.YValues = None
+        self.ZValues = None
+        self.VValues = None
         self.XCutterTransform = None
         self.YCutterTransform = None
         self.ZCutterTransform = None
@@ -402,86 +1172,126 @@ class VTKSurface3D(object):
         self.XCutterFactor = 1
         self.YCutterFactor = 1
         self.ZCutterFactor = 1
-        self.XCutterDelta = None
-        self.YCutterDelta = None
-        self.ZCutterDelta = None
+        self.XCutterValue = None
+        self.YCutterValue = None
+        self.ZCutterValue = None
+        self.analyticSlices = False
         self.rotateX = 30
         self.rotateY = 30
         self.rotateZ = 120
         self.zoomFactor = 1
         self.posFactor = 1
+        self.invalidateGeometry()
 
-    def getCutterData(self):
+    def invalidateGeometry(self):
+        """ drop derived geometry cache - must be called after data or transform change """
+        self._geometryCache = {}
+
+    def _cached(self, key, compute):
+        """ derived geometry value computed once per data and transform state """
+        if key not in self._geometryCache:
+            self._geometryCache[key] = compute()
+        return self._geometryCache[key]
+
+    def getBounds(self):
+        """ surface bounds """
+        return self._cached('bounds', self.mapper.GetBounds)
+
+    def getCenter(self):
+        """ surface center """
+        return self._cached('center', self.mapper.GetCenter)
+
+    def getCutterData(self, columns=False):
         """
         Return Cutters data
         """
-        return self.getXCutterData(), self.getYCutterData()
+        return self.getXCutterData(columns), self.getYCutterData(columns)
 
-    @func.lru_cache
-    def _getXScale(self):
-        """ calculate limit factor and cache it """
-        dlim = self.YLimit
-        plim = (self.XCutterMapper.GetBounds()[2], self.XCutterMapper.GetBounds()[3])
-        scl = (plim[1] - plim[0]) / (dlim[1] - dlim[0])
+    def _cutterProfile(self, mapper, axes, scales, columns=False):
+        """
+        cutter output points as (n, 2) array sorted by first column, taken from vtk points in bulk
+            axes    - point coordinates to take
+            scales  - divisors mapping surface coordinates back to data units
+            columns - return (a, b) columns tuple instead, ready for matplotlib plot(*data)
+        """
+        mapper.Update()
+        points = mapper.GetInput().GetPoints()
 
-        if scl < 0:
-            scl = 1
+        if points is None or points.GetNumberOfPoints() == 0:
+            profile = numpy.empty((0, 2))
+        else:
+            profile = numpy_support.vtk_to_numpy(points.GetData())[:, axes] / scales
+            profile = profile[numpy.argsort(profile[:, 0], kind='mergesort')]
 
-        return scl
+        if columns:
+            return profile[:, 0], profile[:, 1]
 
-    def getXCutterData(self):
-        """ Return X Cutters data """
+        return profile
 
-        if not self.XCutterMapper:
-            return None
+    def _getXScale(self):
+        """ x cutter profile scale - surface y span per data y unit """
+        return self._getXYScale()[1]
 
-        scl = self._getXScale().__wrapped__
+    def getXSliceData(self, value=None, columns=False):
+        """
+        X slice (y, z) profile in data units interpolated from source data, no vtk cutter involved,
+        value defaults to current X cutter value
+        """
+        if self.ZValues is None:
+            return None
 
-        def scale(p):
-            return p / scl
+        if value is None:
+            value = self.XLimit[0] * self.XCutterFactor if self.XCutterValue is None else self.XCutterValue
 
-        self.XCutterMapper.Update()
-        out = self.XCutterMapper.GetInput()
-        data = [(scale(out.GetPoint(i)[1]), out.GetPoint(i)[2]) for i in xrange(out.GetNumberOfPoints())]
-        data = sorted(data, key=lambda s: s[0])
+        return sliceProfile(self.XValues, self.YValues, self.ZValues, value / float(self.XCutterFactor), columns)
 
-        return data
+    def getYSliceData(self, value=None, columns=False):
+        """
+        Y slice (x, z) profile in data units interpolated from source data, no vtk cutter involved,
+        value defaults to current Y cutter value
+        """
+        if self.ZValues is None:
+            return None
 
-    @func.lru_cache
-    def _getYscale(self):
-        """ calculate limit factor and cache it """
-        dlim = self.XLimit
-        plim = (self.YCutterMapper.GetBounds()[0], self.YCutterMapper.GetBounds()[1])
-        scl = (plim[1] - plim[0]) / (dlim[1] - dlim[0])
+        if value is None:
+            value = self.YLimit[0] * self.YCutterFactor if self.YCutterValue is None else self.YCutterValue
 
-        if scl < 0:
-            scl = 1
+        return sliceProfile(self.YValues, self.XValues, self.ZValues.transpose(), value / float(self.YCutterFactor),
+                            columns)
 
-        return scl
+    def getXCutterData(self, columns=False):
+        """ Return X Cutters data - (y, z) profile sorted by y """
 
-    def getYCutterData(self):
-        """ Return Y Cutters data """
+        if self.analyticSlices and self.XCutterTransform:
+            return self.getXSliceData(columns=columns)
 
-        if not self.YCutterMapper:
+        if not self.XCutterMapper:
             return None
 
-        scl = self._getYscale().__wrapped__
+        return self._cutterProfile(self.XCutterMapper, [1, 2], (self._getXScale(), 1.0), columns)
 
-        def scale(p):
-            return p / scl
+    def _getYscale(self):
+        """ y cutter profile scale - surface x span per data x unit """
+        return self._getXYScale()[0]
 
-        self.YCutterMapper.Update()
-        out = self.YCutterMapper.GetInput()
-        data = [(scale(out.GetPoint(i)[0]), out.GetPoint(i)[2]) for i in xrange(out.GetNumberOfPoints())]
-        data = sorted(data, key=lambda s: s[0])
+    def getYCutterData(self, columns=False):
+        """ Return Y Cutters data - (x, z) profile sorted by x """
 
-        return data
+        if self.analyticSlices and self.YCutterTransform:
+            return self.getYSliceData(columns=columns)
+
+        if not self.YCutterMapper:
+            return None
+
+        return self._cutterProfile(self.YCutterMapper, [0, 2], (self._getYscale(), 1.0), columns)
 
-    @func.lru_cache
     def _getXYScale(self):
-        """ calculate limit factor and cache it """
+        """ surface x and y span per data unit """
+        return self._cached('XYScale', self._calculateXYScale)
 
-        bounds = self.mapper.GetBounds()
+    def _calculateXYScale(self):
+        """ calculate surface x and y span per data unit """
+        bounds = self.getBounds()
 
         xlim = self.XLimit
         xplim = (bounds[0], bounds[1])
@@ -499,26 +1309,13 @@ class VTKSurface3D(object):
 
         return xscl, yscl
 
-    def getZCutterData(self):
-        """ Return Z Cutters data """
+    def getZCutterData(self, columns=False):
+        """ Return Z Cutters data - (x, y) contour points sorted by x """
 
         if not self.ZCutterMapper:
             return None
 
-        xscale, yscale = self._getXYScale().__wrapped__
-
-        def scalex(p):
-            return p / xscale
-
-        def scaley(p):
-            return p / yscale
-
-        self.ZCutterMapper.Update()
-        out = self.ZCutterMapper.GetInput()
-        data = [(scalex(out.GetPoint(i)[0]), scaley(out.GetPoint(i)[1])) for i in xrange(out.GetNumberOfPoints())]
-        data = sorted(data, key=lambda s: s[0])
-
-        return data
+        return self._cutterProfile(self.ZCutterMapper, [0, 1], self._getXYScale(), columns)
 
     def getDataRanges(self):
         """ Return data ranges """
@@ -554,23 +1351,13 @@ class VTKSurface3D(object):
 
         return zs
 
-    def render_geometry(self, vx, vy, vz, mv, **kwargs):
-        """ create geometry """
-
-        self.hasData = False
-        gridData = kwargs.get('gridData', True)
-
-        if gridData:
-            self.gridfunc = vtk.vtkStructuredGrid()
-        else:
-            self.gridfunc = vtk.vtkRectilinearGrid()
-
-        # check data structure
-        if type(vx) is not numpy.ndarray or type(vy) is not numpy.ndarray:
+    def _validateData(self, vx, vy, vz, mv):
+        """ check data structure """
+        if not isinstance(vx, numpy.ndarray) or not isinstance(vy, numpy.ndarray):
             logging.error('X,Y vectors must be numpy arrays')
             return False
 
-        if type(vz) is not numpy.ndarray:
+        if not isinstance(vz, numpy.ndarray):
             logging.error('Z vector must be numpy array')
             return False
 
@@ -601,57 +1388,70 @@ class VTKSurface3D(object):
                 logging.error('Z and V dimension not match')
                 return False
 
-        Nx = vx.size
-        Ny = vy.size
-        Nz = vz.size
+        return True
 
-        # put data, z, into a 2D structured grid
-        self.Points = vtk.vtkPoints()
-        [self.Points.InsertNextPoint(vx[i], vy[j], vz[i, j]) for j in xrange(Ny) for i in xrange(Nx)]
+    def _setData(self, vx, vy, vz, mv):
+        """ keep source data """
+        self.XValues = vx
+        self.YValues = vy
+        self.ZValues = vz
+        self.VValues = mv
 
-        if gridData:
-            self.gridfunc.SetDimensions(Nx, Ny, 1)
-            self.gridfunc.SetPoints(self.Points)
+    def _trackRanges(self, vz, mv):
+        """ scan Z and V ranges once after whole matrices are written, rolling window keeps its own trackers """
+        if self.ring:
+            self.ZTracker, self.VTracker = self.ring.ztracker, self.ring.vtracker
         else:
-            xCoords = vtk.vtkFloatArray()
-            [xCoords.InsertNextValue(vx[i]) for i in xrange(Nx)]
+            self.ZTracker = RangeTracker(vz)
+            self.VTracker = RangeTracker(mv) if mv is not None else None
 
-            yCoords = vtk.vtkFloatArray()
-            [yCoords.InsertNextValue(vy[j]) for j in xrange(Ny)]
+    def _maskInvalid(self, mask):
+        """
+        blank points with missing values and drop cells touching them - structured grid points are hidden
+        through point ghost array, rectilinear grid cells are removed after geometry filter which ignores
+        blanking, ghost arrays are rebuilt only when mask changes
+        """
+        if self.gridData and mask is not None:
+            # finite placeholders keep bounds and scalar range clean, blanked points are never drawn
+            points = mask.ravel(order='F')
+            self.PointsData[points, 2] = self.ZTracker.min
+            self.ColorsData[points] = (self.VTracker or self.ZTracker).min
 
-            s = list(vz.flatten())
-            vz = numpy.array(s)
-            # vz.sort()
-            Nz = vz.size
+        if sameMask(mask, self.Mask):
+            return
 
-            zCoords = vtk.vtkFloatArray()
-            [zCoords.InsertNextValue(vz[k]) for k in xrange(Nz)]
+        self.Mask = mask
+        name = vtk.vtkDataSetAttributes.GhostArrayName()
+        self.gridfunc.GetPointData().RemoveArray(name)
+        self.gridfunc.GetCellData().RemoveArray(name)
 
-            vCoords = vtk.vtkFloatArray()
-            [vCoords.InsertNextValue(n) for n in xrange(1)]
+        if mask is None:
+            return
 
-            self.gridfunc.SetDimensions(Nx, Ny, 1)
-            self.gridfunc.SetXCoordinates(xCoords)
-            self.gridfunc.SetYCoordinates(yCoords)
-            self.gridfunc.SetZCoordinates(vCoords)
+        if self.gridData:
+            self.gridfunc.GetPointData().AddArray(ghostArray(mask, vtk.vtkDataSetAttributes.HIDDENPOINT))
+        else:
+            self.gridfunc.GetCellData().AddArray(ghostArray(cellMask(mask), vtk.vtkDataSetAttributes.DUPLICATECELL))
 
-        # get scalar field from z/v-values
-        self.Colors = vtk.vtkFloatArray()
-        self.Colors.SetNumberOfComponents(1)
-        self.Colors.SetNumberOfTuples(Nx * Ny)
+    def _calculateLimits(self):
+        """ calculate data limits and scales from source data, Z range comes from tracker without rescan """
+        vx, vy = self.XValues, self.YValues
 
-        pt = mv if mva else vz
-        [self.Colors.InsertComponent(i + j * Nx, 0, pt[i, j]) for j in xrange(Ny) for i in xrange(Nx)]
+        XLimit = (vx.min(), vx.max())
+        YLimit = (vy.min(), vy.max())
+        if self.ring:
+            if self.ring.axis == 0:
+                XLimit = self.ring.coordsRange()
+            else:
+                YLimit = self.ring.coordsRange()
 
-        self.gridfunc.GetPointData().SetScalars(self.Colors)
-        self.hasData = True
+        # filter none
+        ZLimit = self.ZTracker.range()
 
         # scaling
-        Xrange = vx.max() - vx.min()
-        Yrange = vy.max() - vy.min()
-
-        # filter none
-        Zrange = numpy.nanmax(vz) - numpy.nanmin(vz)
+        Xrange = XLimit[1] - XLimit[0]
+        Yrange = YLimit[1] - YLimit[0]
+        Zrange = ZLimit[1] - ZLimit[0]
 
         # must have x or y ranges
         if 0 in (Xrange, Yrange):
@@ -659,9 +1459,9 @@ class VTKSurface3D(object):
             self.hasData = False
             raise Exception('Zero X or Y Axis Range: %s', (Xrange, Yrange))
 
-        self.XLimit = (vx.min(), vx.max())
-        self.YLimit = (vy.min(), vy.max())
-        self.ZLimit = (numpy.nanmin(vz), numpy.nanmax(vz))
+        self.XLimit = XLimit
+        self.YLimit = YLimit
+        self.ZLimit = ZLimit
 
         # check for constant Z range
         if Zrange == 0:
@@ -671,6 +1471,95 @@ class VTKSurface3D(object):
         self.YScale = float(Zrange) / float(Yrange)
         self.ZScale = float(Zrange) / float(Zrange)
 
+        return Xrange, Yrange, Zrange
+
+    def render_geometry(self, vx, vy, vz, mv, **kwargs):
+        """ create geometry """
+
+        self.hasData = False
+        self.gridData = gridData = kwargs.get('gridData', True)
+        self.imageData = imageData = not gridData and kwargs.get('imageData', False)
+
+        if gridData:
+            self.gridfunc = vtk.vtkStructuredGrid()
+        elif imageData:
+            self.gridfunc = vtk.vtkImageData()
+        else:
+            self.gridfunc = vtk.vtkRectilinearGrid()
+
+        if not self._validateData(vx, vy, vz, mv):
+            return False
+
+        if imageData and not (isUniform(vx) and isUniform(vy)):
+            logging.error('Image data needs uniformly spaced ascending X and Y')
+            return False
+
+        precision = kwargs.get('precision', None)
+        if precision is not None and precision not in PRECISIONS:
+            logging.error('Unknown precision: %s', precision)
+            return False
+        dtype = PRECISIONS.get(precision)
+        vz, mv = asPrecision(vz, dtype), asPrecision(mv, dtype)
+
+        mva = isinstance(mv, numpy.ndarray) and mv.any()
+        self._setData(vx, vy, vz, mv if mva else None)
+        self._trackRanges(vz, mv if mva else None)
+
+        Nx = vx.size
+        Ny = vy.size
+        Nz = vz.size
+
+        with stage('array_fill', self.timings):
+            if gridData:
+                # put data, z, into a 2D structured grid - vtk arrays wrap numpy buffers directly
+                self.PointsData = gridPoints(vx, vy, vz, self._fillChunks(0, 2))
+                self.Points = vtk.vtkPoints()
+                self.Points.SetData(numpy_support.numpy_to_vtk(self.PointsData))
+
+                self.gridfunc.SetDimensions(Nx, Ny, 1)
+                self.gridfunc.SetPoints(self.Points)
+
+                # get scalar field from z/v-values
+                self.ColorsData = gridScalars(mv if mva else vz, dtype or numpy.float32, self._fillChunks(1, 2))
+                self.Colors = numpy_support.numpy_to_vtk(self.ColorsData)
+            else:
+                # keep axis coordinates (image data - origin and spacing) only,
+                # z values stay scalars warped into heights later
+                self.gridfunc.SetDimensions(Nx, Ny, 1)
+                if imageData:
+                    self._placeImage(vx, vy)
+                else:
+                    zCoords = vtk.vtkFloatArray()
+                    zCoords.InsertNextValue(0)
+
+                    coords = dtype or numpy.float64
+                    self.gridfunc.SetXCoordinates(numpy_support.numpy_to_vtk(numpy.asarray(vx, coords), deep=True))
+                    self.gridfunc.SetYCoordinates(numpy_support.numpy_to_vtk(numpy.asarray(vy, coords), deep=True))
+                    self.gridfunc.SetZCoordinates(zCoords)
+
+                # fortran ordered (or memory mapped) matrices are wrapped in place
+                self.HeightsData = gridValues(vz, dtype, self._fillChunks(0, 2 if mva else 1))
+                self.Heights = numpy_support.numpy_to_vtk(self.HeightsData)
+                self.Heights.SetName('Z')
+
+                if mva:
+                    self.ColorsData = gridValues(mv, dtype, self._fillChunks(1, 2))
+                    self.Colors = numpy_support.numpy_to_vtk(self.ColorsData)
+                    self.gridfunc.GetPointData().AddArray(self.Heights)
+                else:
+                    self.ColorsData = self.HeightsData
+                    self.Colors = self.Heights
+
+            self.gridfunc.GetPointData().SetScalars(self.Colors)
+
+        if kwargs.get('maskInvalid', False):
+            with stage('mask', self.timings):
+                self._maskInvalid(invalidMask(vz, mv if mva else None))
+
+        self.hasData = True
+
+        Xrange, Yrange, Zrange = self._calculateLimits()
+
         # fire callbacks
         if self.hasData:
             self.fireCallbacks(callback='OnDataRange')
@@ -681,21 +1570,19 @@ class VTKSurface3D(object):
 
         return self.hasData
 
-    def buildColormap(self, color='rainbow', reverse=True):
-        clut = vtk.vtkLookupTable()
+    def _fillChunks(self, part, parts):
+        """ chunk callback of part-th of parts array fills, reports overall fill fraction to fill callback """
+        if not self.fillCallback:
+            return None
+        return lambda done, total: self.fillCallback((part + float(done) / total) / parts)
+
+    def buildColormap(self, color='rainbow', reverse=True, numberOfColors=None):
         luts = self.config.LookupTables() if self.config else {}
 
         if color in luts:
-            lut = luts[color]
-            if reverse:
-                lut.reverse()
-            clut.SetNumberOfColors(len(lut))
-            clut.Build()
-            for i in xrange(len(lut)):
-                lt = lut[i]
-                clut.SetTableValue(i, lt[0], lt[1], lt[2], lt[3])
+            return colors.lookup_table(color, reverse, numberOfColors)
 
-            return clut
+        clut = vtk.vtkLookupTable()
 
         hue_range = 0.0, 0.6667
         saturation_range = 1.0, 1.0
@@ -720,6 +1607,8 @@ class VTKSurface3D(object):
                 saturation_range = 0.0, 0.0
                 value_range = 0.0, 1.0
 
+        if numberOfColors:
+            clut.SetNumberOfColors(numberOfColors)
         clut.SetHueRange(hue_range)
         clut.SetSaturationRange(saturation_range)
         clut.SetValueRange(value_range)
@@ -727,12 +1616,13 @@ class VTKSurface3D(object):
 
         return clut
 
-    def applyColorMap(self, colorMap='red-blue', reverse=False):
+    def applyColorMap(self, colorMap='red-blue', reverse=False, numberOfColors=None):
         """
         apply color map on the mapper
         """
-        clut = self.buildColormap(colorMap, reverse)
-        self.mapper.SetLookupTable(clut)
+        clut = self.buildColormap(colorMap, reverse, numberOfColors)
+        # update table in place - mappers and colorbars of all views sharing it follow
+        self.mapper.GetLookupTable().DeepCopy(clut)
         self.colorbar.SetLookupTable(self.mapper.GetLookupTable())
 
     def makeCustomAxes(self, outline, outlinefilter):
@@ -792,7 +1682,7 @@ class VTKSurface3D(object):
         axes.SetXLabel(self.config.XLabel())
         axes.SetYLabel(self.config.YLabel())
         axes.SetZLabel(self.config.ZLabel())
-        axes.SetRanges(self.out.GetBounds())
+        axes.SetRanges(self._dataBounds())
         axes.SetUseRanges(True)
         axes.SetProperty(prop)
         axes.SetAxisTitleTextProperty(tprop)
@@ -801,9 +1691,8 @@ class VTKSurface3D(object):
         return zax, axes
 
     def _calculateYCutterDelta(self, bounds):
-        if self.YCutterDelta is None:
-            self.YCutterDelta = (bounds[3] - bounds[2]) / ((self.YLimit[1] - self.YLimit[0]) * self.YCutterFactor)
-        return self.YCutterDelta
+        return self._cached('YCutterDelta', lambda: (bounds[3] - bounds[2]) /
+                            ((self.YLimit[1] - self.YLimit[0]) * self.YCutterFactor))
 
     def _calculateYCutterPos(self, value):
         if self.YCutterFactor < 1:
@@ -815,7 +1704,7 @@ class VTKSurface3D(object):
         if value < self.YLimit[0] * self.YCutterFactor:
             value = self.YLimit[0] * self.YCutterFactor
 
-        bounds = self.mapper.GetBounds()
+        bounds = self.getBounds()
         delta = self._calculateYCutterDelta(bounds)
 
         npos = bounds[2] + (value - self.YLimit[0] * self.YCutterFactor) * delta
@@ -833,6 +1722,7 @@ class VTKSurface3D(object):
             logging.error('Y: %f Value is outside limits %s' % (value, (self.YLimit, self.YCutterFactor),))
             return
 
+        self.YCutterValue = value
         npos = self._calculateYCutterPos(value)
         ypos = self.YCutterTransform.GetPosition()[1]
         move = npos - ypos
@@ -844,21 +1734,38 @@ class VTKSurface3D(object):
         self.YCutterTransform.Translate(0, move, 0)
         self.redraw()
 
+    def _placeYCutter(self, bounds, npos):
+        """ place y cutter plane and its visual transform """
+        if self.yplane:
+            (x, _y, z) = self.yplane.GetOrigin()
+            self.yplane.SetOrigin(x, npos, z)
+
+        tran = self.YCutterTransform
+        tran.Identity()
+        tran.PreMultiply()
+        tran.Translate((bounds[1] - bounds[0]) / 2. - (0 - bounds[0]), npos,
+                       (bounds[5] - bounds[4]) / 2. - (0 - bounds[4]))
+        tran.Scale((bounds[1] - bounds[0]), 1, bounds[5] - bounds[4])
+        tran.PostMultiply()
+
     def makeYCutter(self, bounds, scaleFactor, value):
         # create y plane cutter
 
+        self.YCutterValue = value
         npos = self._calculateYCutterPos(value)
         self.yplane = vtk.vtkPlane()
         self.yplane.SetOrigin(0, npos, 0)
         self.yplane.SetNormal(0, 1, 0)
 
-        self.YCutter = vtk.vtkCutter()
-        self.YCutter.SetInputConnection(self.warp.GetOutputPort())
-        self.YCutter.SetCutFunction(self.yplane)
-        self.YCutter.GenerateCutScalarsOff()
+        # analytic slices are interpolated from source data, no cutter pass
+        if not self.analyticSlices:
+            self.YCutter = vtk.vtkCutter()
+            self.YCutter.SetInputConnection(self.warp.GetOutputPort())
+            self.YCutter.SetCutFunction(self.yplane)
+            self.YCutter.GenerateCutScalarsOff()
 
-        self.YCutterMapper = vtk.vtkPolyDataMapper()
-        self.YCutterMapper.SetInputConnection(self.YCutter.GetOutputPort())
+            self.YCutterMapper = vtk.vtkPolyDataMapper()
+            self.YCutterMapper.SetInputConnection(self.YCutter.GetOutputPort())
 
         # visual plane to move
         plane = vtk.vtkPlaneSource()
@@ -867,12 +1774,8 @@ class VTKSurface3D(object):
         plane.SetNormal(0, 1, 0)
 
         tran = vtk.vtkTransform()
-        tran.Translate((bounds[1] - bounds[0]) / 2. - (0 - bounds[0]), npos,
-                       (bounds[5] - bounds[4]) / 2. - (0 - bounds[4]))
-        tran.Scale((bounds[1] - bounds[0]), 1, bounds[5] - bounds[4])
-        tran.PostMultiply()
-
         self.YCutterTransform = tran
+        self._placeYCutter(bounds, npos)
 
         tranf = vtk.vtkTransformPolyDataFilter()
         tranf.SetInputConnection(plane.GetOutputPort())
@@ -897,6 +1800,7 @@ class VTKSurface3D(object):
             logging.error('Z: %f Value is outside limits %s' % (value, ( self.ZLimit, self.ZCutterFactor),))
             return
 
+        self.ZCutterValue = value
         npos = self._calculateZCutterPos(value)
         zpos = self.ZCutterTransform.GetPosition()[2]
         move = npos - zpos
@@ -909,9 +1813,8 @@ class VTKSurface3D(object):
         self.redraw()
 
     def _calculateZCutterDelta(self, bounds):
-        if self.ZCutterDelta is None:
-            self.ZCutterDelta = (bounds[5] - bounds[4]) / ((self.ZLimit[1] - self.ZLimit[0]) * self.ZCutterFactor)
-        return self.ZCutterDelta
+        return self._cached('ZCutterDelta', lambda: (bounds[5] - bounds[4]) /
+                            ((self.ZLimit[1] - self.ZLimit[0]) * self.ZCutterFactor))
 
     def _calculateZCutterPos(self, value):
         if self.ZCutterFactor < 1:
@@ -923,15 +1826,30 @@ class VTKSurface3D(object):
         if value < self.ZLimit[0] * self.ZCutterFactor:
             value = self.ZLimit[0] * self.ZCutterFactor
 
-        bounds = self.mapper.GetBounds()
+        bounds = self.getBounds()
         delta = self._calculateZCutterDelta(bounds)
 
         npos = bounds[4] + (value - self.ZLimit[0] * self.ZCutterFactor) * delta
         return npos
 
+    def _placeZCutter(self, bounds, npos):
+        """ place z cutter plane and its visual transform """
+        if self.zplane:
+            (x, y, _z) = self.zplane.GetOrigin()
+            self.zplane.SetOrigin(x, y, npos)
+
+        tran = self.ZCutterTransform
+        tran.Identity()
+        tran.PreMultiply()
+        tran.Translate((bounds[1] - bounds[0]) / 2. - (0 - bounds[0]), (bounds[3] - bounds[2]) / 2. - (0 - bounds[2]),
+                       npos)
+        tran.Scale((bounds[1] - bounds[0]), (bounds[3] - bounds[2]), 1)
+        tran.PostMultiply()
+
     def makeZCutter(self, bounds, scaleFactor, value):
         """ create z cutter plane """
 
+        self.ZCutterValue = value
         npos = self._calculateZCutterPos(value)
         self.zplane = vtk.vtkPlane()
         self.zplane.SetOrigin(0, 0, npos)
@@ -952,12 +1870,8 @@ class VTKSurface3D(object):
         plane.SetNormal(0, 0, 1)
 
         tran = vtk.vtkTransform()
-        tran.Translate((bounds[1] - bounds[0]) / 2. - (0 - bounds[0]), (bounds[3] - bounds[2]) / 2. - (0 - bounds[2]),
-                       npos)
-        tran.Scale((bounds[1] - bounds[0]), (bounds[3] - bounds[2]), 1)
-        tran.PostMultiply()
-
         self.ZCutterTransform = tran
+        self._placeZCutter(bounds, npos)
 
         tranf = vtk.vtkTransformPolyDataFilter()
         tranf.SetInputConnection(plane.GetOutputPort())
@@ -974,9 +1888,8 @@ class VTKSurface3D(object):
         return actor
 
     def _calculateXCutterDelta(self, bounds):
-        if self.XCutterDelta is None:
-            self.XCutterDelta = (bounds[1] - bounds[0]) / ((self.XLimit[1] - self.XLimit[0]) * self.XCutterFactor)
-        return self.XCutterDelta
+        return self._cached('XCutterDelta', lambda: (bounds[1] - bounds[0]) /
+                            ((self.XLimit[1] - self.XLimit[0]) * self.XCutterFactor))
 
     def _calculateXCutterPos(self, value):
         if self.XCutterFactor < 1:
@@ -988,7 +1901,7 @@ class VTKSurface3D(object):
         if value < self.XLimit[0] * self.XCutterFactor:
             value = self.XLimit[0] * self.XCutterFactor
 
-        bounds = self.mapper.GetBounds()
+        bounds = self.getBounds()
         delta = self._calculateXCutterDelta(bounds)
 
         npos = bounds[0] + (value - self.XLimit[0] * self.XCutterFactor) * delta
@@ -1003,6 +1916,7 @@ class VTKSurface3D(object):
             logging.error('X: %f Value is outside limits %s' % (value, (self.XLimit, self.XCutterFactor),))
             return
 
+        self.XCutterValue = value
         npos = self._calculateXCutterPos(value)
         xpos = self.XCutterTransform.GetPosition()[0]
         move = npos - xpos
@@ -1014,21 +1928,38 @@ class VTKSurface3D(object):
         self.XCutterTransform.Translate(move, 0, 0)
         self.redraw()
 
+    def _placeXCutter(self, bounds, npos):
+        """ place x cutter plane and its visual transform """
+        if self.xplane:
+            (_x, y, z) = self.xplane.GetOrigin()
+            self.xplane.SetOrigin(npos, y, z)
+
+        tran = self.XCutterTransform
+        tran.Identity()
+        tran.PreMultiply()
+        tran.Translate(npos, (bounds[3] - bounds[2]) / 2. - (0 - bounds[2]),
+                       (bounds[5] - bounds[4]) / 2. - (0 - bounds[4]))
+        tran.Scale(1, (bounds[3] - bounds[2]), bounds[5] - bounds[4])
+        tran.PostMultiply()
+
     def makeXCutter(self, bounds, scaleFactor, value):
         # create X plane cutter
 
+        self.XCutterValue = value
         npos = self._calculateXCutterPos(value)
         self.xplane = vtk.vtkPlane()
         self.xplane.SetOrigin(npos, 0, 0)
         self.xplane.SetNormal(1, 0, 0)
 
-        self.XCutter = vtk.vtkCutter()
-        self.XCutter.SetInputConnection(self.warp.GetOutputPort())
-        self.XCutter.SetCutFunction(self.xplane)
-        self.XCutter.GenerateCutScalarsOff()
+        # analytic slices are interpolated from source data, no cutter pass
+        if not self.analyticSlices:
+            self.XCutter = vtk.vtkCutter()
+            self.XCutter.SetInputConnection(self.warp.GetOutputPort())
+            self.XCutter.SetCutFunction(self.xplane)
+            self.XCutter.GenerateCutScalarsOff()
 
-        self.XCutterMapper = vtk.vtkPolyDataMapper()
-        self.XCutterMapper.SetInputConnection(self.XCutter.GetOutputPort())
+            self.XCutterMapper = vtk.vtkPolyDataMapper()
+            self.XCutterMapper.SetInputConnection(self.XCutter.GetOutputPort())
 
         # visual plane to move
         plane = vtk.vtkPlaneSource()
@@ -1037,12 +1968,8 @@ class VTKSurface3D(object):
         plane.SetNormal(1, 0, 0)
 
         tran = vtk.vtkTransform()
-        tran.Translate(npos, (bounds[3] - bounds[2]) / 2. - (0 - bounds[2]),
-                       (bounds[5] - bounds[4]) / 2. - (0 - bounds[4]))
-        tran.Scale(1, (bounds[3] - bounds[2]), bounds[5] - bounds[4])
-        tran.PostMultiply()
-
         self.XCutterTransform = tran
+        self._placeXCutter(bounds, npos)
 
         tranf = vtk.vtkTransformPolyDataFilter()
         tranf.SetInputConnection(plane.GetOutputPort())
@@ -1089,11 +2016,11 @@ class VTKSurface3D(object):
         self.rotateZ = args.get('rotateZ', 120)
         self.zoomFactor = args.get('zoomFactor', 1)
         self.posFactor = args.get('posFactor', 1)
+        self.analyticSlices = args.get('analyticSlices', False)
 
     def render(self, **args):
         """ main function to render all required objects """
 
-        gridData = args.get('gridData', True)
         drawSurface = args.get('drawSurface', True)
         drawAxes = args.get('drawAxes', True)
         drawColorBar = args.get('drawColorBar', True)
@@ -1101,9 +2028,11 @@ class VTKSurface3D(object):
         wireSurface = args.get('wireSurface', False)
         drawBox = args.get('drawBox', True)
         scaleFactor = args.get('scaleFactor', (1, 1, 1))
-        autoscale = args.get('autoScale', True)
         colorMap = args.get('colorMap', 'rainbow')
         reverseMap = args.get('reverseMap', False)
+        numberOfColors = args.get('numberOfColors', None)
+        levelOfDetail = args.get('levelOfDetail', False)
+        lodLevels = args.get('lodLevels', LOD_LEVELS)
         drawGrid = args.get('drawGrid', False)
         resolution = args.get('gridResolution', 10)
         xtics = args.get('xtics', 0)
@@ -1118,87 +2047,27 @@ class VTKSurface3D(object):
         zCutterPos = args.get('ZCutterPos', None)
 
         self.parseRenderArgs(**args)
+        self.renderArgs = args
 
-        if gridData:
-            geometry = vtk.vtkStructuredGridGeometryFilter()
-        else:
-            geometry = vtk.vtkRectilinearGridGeometryFilter()
-
-        geometry.SetInputData(self.gridfunc)
-        geometry.SetExtent(self.gridfunc.GetExtent())
-
-        if gridData:
-            wzscale = self.computeScale(self.gridfunc)
-            self.out = geometry.GetOutput()
-        else:
-            geometry.SetExtent(self.gridfunc.GetExtent())
-            geometry.GetOutput().SetPoints(self.Points)
-            geometry.GetOutput().GetPointData().SetScalars(self.Colors)
-            geometry.GetOutput().Update()
-
-            self.out = geometry.GetOutput()
-            self.out.SetPoints(self.Points)
-            self.out.GetPointData().SetScalars(self.Colors)
-            self.out.Update()
-            wzscale = self.computeScale(self.out)
-
-        x = self.XScale if autoscale else self.XScale * scaleFactor[0]
-        y = self.YScale if autoscale else self.YScale * scaleFactor[1]
-        z = 0.5 * self.ZScale if autoscale else self.ZScale * scaleFactor[2]
-
-        transform = vtk.vtkTransform()
-        transform.Scale(x, y, z)
-        trans = vtk.vtkTransformPolyDataFilter()
-        trans.SetInputConnection(geometry.GetOutputPort())
-        trans.SetTransform(transform)
-
-        localScale = wzscale if wzscale < 1 else 1 / wzscale
-
-        self.warp = vtk.vtkWarpScalar()
-        self.warp.XYPlaneOn()
-        self.warp.SetInputConnection(trans.GetOutputPort())
-        self.warp.SetNormal(0, 0, 1)
-        self.warp.UseNormalOn()
-        self.warp.SetScaleFactor(localScale)
-
-        tmp = self.gridfunc.GetScalarRange()
-
-        # map gridfunction
-        self.mapper = vtk.vtkPolyDataMapper()
-        self.mapper.SetInputConnection(self.warp.GetOutputPort())
-
-        # calculate ranges
-        if self.customZRange:
-            self.mapper.SetScalarRange(*self.customZRange)
-        elif self.autoZRange:
-            mx = max(abs(tmp[0]), abs(tmp[1]))
-            self.mapper.SetScalarRange(-mx, mx)
-        else:
-            self.mapper.SetScalarRange(tmp[0], tmp[1])
+        # pipeline up to mapper is built once and shared between renderers
+        if not self.shared:
+            self.makePipeline(**args)
 
         wireActor = None
-        bounds = self.mapper.GetBounds()
+        self.invalidateGeometry()
+        bounds = self.getBounds()
 
         # wire mapper
         if planeGrid:
-            if not gridData:
-                self.plane = vtk.vtkRectilinearGridGeometryFilter()
-                self.plane.SetInput(self.gridfunc)
-                self.plane.SetExtent(self.gridfunc.GetExtent())
-                x_, y_ = x, y
-            else:
-                self.plane = vtk.vtkPlaneSource()
-                self.plane.SetXResolution(resolution)
-                self.plane.SetYResolution(resolution)
-                x_, y_ = bounds[1] - bounds[0], bounds[3] - bounds[2]
-
-            pltr = vtk.vtkTransform()
-            pltr.Translate((bounds[1] - bounds[0]) / 2. - (0 - bounds[0]),
-                           (bounds[3] - bounds[2]) / 2. - (0 - bounds[2]), bounds[4])
-            pltr.Scale(x_, y_, 1)
+            self.plane = vtk.vtkPlaneSource()
+            self.plane.SetXResolution(resolution)
+            self.plane.SetYResolution(resolution)
+
+            self.planeTransform = vtk.vtkTransform()
+            self._placePlaneGrid(bounds, bounds[1] - bounds[0], bounds[3] - bounds[2])
             pltran = vtk.vtkTransformPolyDataFilter()
             pltran.SetInputConnection(self.plane.GetOutputPort())
-            pltran.SetTransform(pltr)
+            pltran.SetTransform(self.planeTransform)
 
             cmap = self.buildColormap('black-white', True)
 
@@ -1211,60 +2080,67 @@ class VTKSurface3D(object):
             wireActor.GetProperty().SetRepresentationToWireframe()
             wireActor.GetProperty().SetColor(self.fgColor)
 
-        # xcutter actor
-        xactor = None
-        if xCutterOn:
-            xactor = self.makeXCutter(bounds, scaleFactor, xCutterPos)
+        with stage('cutters', self.timings):
+            # xcutter actor
+            xactor = None
+            if xCutterOn:
+                xactor = self.makeXCutter(bounds, scaleFactor, xCutterPos)
 
-        # ycutter actor
-        yactor = None
-        if yCutterOn:
-            yactor = self.makeYCutter(bounds, scaleFactor, yCutterPos)
+            # ycutter actor
+            yactor = None
+            if yCutterOn:
+                yactor = self.makeYCutter(bounds, scaleFactor, yCutterPos)
 
-        # zcutter actor
-        zactor = None
-        if zCutterOn:
-            zactor = self.makeZCutter(bounds, scaleFactor, zCutterPos)
+            # zcutter actor
+            zactor = None
+            if zCutterOn:
+                zactor = self.makeZCutter(bounds, scaleFactor, zCutterPos)
 
         # create plot surface actor
-        surfplot = vtk.vtkActor()
-        surfplot.SetMapper(self.mapper)
-        if wireSurface:
-            surfplot.GetProperty().SetRepresentationToWireframe()
+        if levelOfDetail:
+            surfplot = self.makeLODSurface(lodLevels, wireSurface)
+        else:
+            surfplot = vtk.vtkActor()
+            surfplot.SetMapper(self.mapper)
+            if wireSurface:
+                surfplot.GetProperty().SetRepresentationToWireframe()
 
         # color map
-        clut = self.buildColormap(colorMap, reverseMap)
-        self.mapper.SetLookupTable(clut)
-
-        # create outline
-        outlinefilter = vtk.vtkOutlineFilter()
-        outlinefilter.SetInputConnection(self.warp.GetOutputPort())
-
-        outlineMapper = vtk.vtkPolyDataMapper()
-        outlineMapper.SetInputConnection(outlinefilter.GetOutputPort())
-        outline = vtk.vtkActor()
-        outline.SetMapper(outlineMapper)
-        outline.GetProperty().SetColor(self.fgColor)
-
-        # make axes
-        zax, axes = self.makeAxes(outline, outlinefilter)
-
-        # setup axes
-        xaxis = axes.GetXAxisActor2D()
-        yaxis = axes.GetYAxisActor2D()
-        zaxis = axes.GetZAxisActor2D()
-
-        xaxis.SetLabelFormat(self.config.XLabelsFormat())
-        xaxis.SetAdjustLabels(1)
-        xaxis.SetNumberOfMinorTicks(xtics)
-
-        yaxis.SetLabelFormat(self.config.YLabelsFormat())
-        yaxis.SetNumberOfMinorTicks(ytics)
-        yaxis.SetAdjustLabels(1)
-
-        zaxis.SetLabelFormat(self.config.ZLabelsFormat())
-        zaxis.SetNumberOfMinorTicks(ztics)
-        zaxis.SetAdjustLabels(1)
+        if not self.shared:
+            clut = self.buildColormap(colorMap, reverseMap, numberOfColors)
+            self._setLookupTable(clut)
+
+        with stage('axes', self.timings):
+            # create outline
+            outlinefilter = vtk.vtkOutlineFilter()
+            outlinefilter.SetInputConnection(self.warp.GetOutputPort())
+
+            outlineMapper = vtk.vtkPolyDataMapper()
+            outlineMapper.SetInputConnection(outlinefilter.GetOutputPort())
+            outline = vtk.vtkActor()
+            outline.SetMapper(outlineMapper)
+            outline.GetProperty().SetColor(self.fgColor)
+
+            # make axes
+            zax, axes = self.makeAxes(outline, outlinefilter)
+            self.gridAxes, self.axes = zax, axes
+
+            # setup axes
+            xaxis = axes.GetXAxisActor2D()
+            yaxis = axes.GetYAxisActor2D()
+            zaxis = axes.GetZAxisActor2D()
+
+            xaxis.SetLabelFormat(self.config.XLabelsFormat())
+            xaxis.SetAdjustLabels(1)
+            xaxis.SetNumberOfMinorTicks(xtics)
+
+            yaxis.SetLabelFormat(self.config.YLabelsFormat())
+            yaxis.SetNumberOfMinorTicks(ytics)
+            yaxis.SetAdjustLabels(1)
+
+            zaxis.SetLabelFormat(self.config.ZLabelsFormat())
+            zaxis.SetNumberOfMinorTicks(ztics)
+            zaxis.SetAdjustLabels(1)
 
         # create colorbar
         colorbar = self.makeColorbar()
@@ -1292,6 +2168,249 @@ class VTKSurface3D(object):
         self.colorbar = colorbar
         self._addPlaneCutters(xactor, yactor, zactor, xCutterOn, yCutterOn, zCutterOn)
 
+    def makePipeline(self, **args):
+        """ create surface pipeline - geometry, transform, warp and mapper """
+        gridData = args.get('gridData', True)
+
+        if gridData:
+            geometry = vtk.vtkStructuredGridGeometryFilter()
+        elif self.imageData:
+            geometry = vtk.vtkImageDataGeometryFilter()
+        else:
+            geometry = vtk.vtkRectilinearGridGeometryFilter()
+
+        geometry.SetInputData(self.gridfunc)
+        geometry.SetExtent(self._gridExtent())
+        self.geometry = geometry
+        self.out = geometry.GetOutput()
+        source = self._maskedSource(geometry, **args)
+
+        x, y, z = self._transformScale(**args)
+
+        self.transform = vtk.vtkTransform()
+        self.transform.Scale(x, y, z)
+        trans = vtk.vtkTransformPolyDataFilter()
+        trans.SetInputConnection(source.GetOutputPort())
+        trans.SetTransform(self.transform)
+
+        self.warp = self._makeWarp(trans, self._warpScale())
+
+        # map gridfunction
+        self.mapper = vtk.vtkPolyDataMapper()
+        self.mapper.SetInputConnection(self.warp.GetOutputPort())
+
+        # calculate ranges
+        self._applyScalarRange()
+
+        if self.timings:
+            # run stage by stage, whole pipeline runs at once on first bounds or render otherwise
+            with stage('geometry', self.timings):
+                geometry.Update()
+            with stage('warp', self.timings):
+                self.warp.Update()
+            with stage('mapper', self.timings):
+                self.mapper.Update()
+
+    def _maskedSource(self, geometry, **args):
+        """
+        drop masked cells of rectilinear grid geometry and points left unused by them, which hold missing values
+        the warp would turn into nan coordinates, structured grid geometry filter skips both itself
+        """
+        if self.gridData or not args.get('maskInvalid', False):
+            return geometry
+
+        ghosts = vtk.vtkRemoveGhosts()
+        ghosts.SetInputConnection(geometry.GetOutputPort())
+
+        unused = vtk.vtkCleanPolyData()
+        unused.PointMergingOff()
+        unused.SetInputConnection(ghosts.GetOutputPort())
+        return unused
+
+    def _transformScale(self, **args):
+        """ surface transform scale factors """
+        scaleFactor = args.get('scaleFactor', (1, 1, 1))
+        autoscale = args.get('autoScale', True)
+
+        x = self.XScale if autoscale else self.XScale * scaleFactor[0]
+        y = self.YScale if autoscale else self.YScale * scaleFactor[1]
+        z = 0.5 * self.ZScale if autoscale else self.ZScale * scaleFactor[2]
+
+        return x, y, z
+
+    def _warpScale(self):
+        """
+        warp scale factor - structured grid lifts transformed z coordinates,
+        rectilinear grid lifts raw Z scalars so z transform scale is folded in
+        """
+        if self.gridData:
+            wzscale = self.computeScale(self.gridfunc)
+        else:
+            wzscale = float(self.ZLimit[1] - self.ZLimit[0]) / min(self.getXRange(), self.getYRange())
+
+        localScale = wzscale if wzscale < 1 else 1 / wzscale
+
+        if self.gridData:
+            return localScale
+
+        return self._transformScale(**self.renderArgs)[2] * (1 + localScale)
+
+    def _makeWarp(self, source, scaleFactor):
+        """ create surface warp """
+        warp = vtk.vtkWarpScalar()
+        if self.gridData:
+            warp.XYPlaneOn()
+        else:
+            warp.XYPlaneOff()
+            warp.SetInputArrayToProcess(0, 0, 0, vtk.vtkDataObject.FIELD_ASSOCIATION_POINTS, 'Z')
+        warp.SetInputConnection(source.GetOutputPort())
+        warp.SetNormal(0, 0, 1)
+        warp.UseNormalOn()
+        warp.SetScaleFactor(scaleFactor)
+
+        return warp
+
+    def _dataBounds(self):
+        """ source data bounds for axes labels """
+        if self.gridData:
+            return self.out.GetBounds()
+
+        return self.XLimit + self.YLimit + self.ZLimit
+
+    def _gridExtent(self):
+        """ grid extent turned into surface - rolling window or whole grid """
+        if self.ring:
+            return self.ring.extent()
+        return self.gridfunc.GetExtent()
+
+    def _scalarRange(self):
+        """ color scalars range from V or Z tracker in precision of scalars array, no rescan of grid """
+        return (self.VTracker or self.ZTracker).range(self.ColorsData.dtype.type)
+
+    def _applyScalarRange(self):
+        """ set mapper scalar range """
+        tmp = self._scalarRange()
+
+        if self.customZRange:
+            self.mapper.SetScalarRange(*self.customZRange)
+        elif self.autoZRange:
+            mx = max(abs(tmp[0]), abs(tmp[1]))
+            self.mapper.SetScalarRange(-mx, mx)
+        else:
+            self.mapper.SetScalarRange(tmp[0], tmp[1])
+
+        for mapper in self.lodMappers:
+            mapper.SetScalarRange(self.mapper.GetScalarRange())
+
+    def _setLookupTable(self, clut):
+        """ set lookup table on surface mappers """
+        self.mapper.SetLookupTable(clut)
+        for mapper in self.lodMappers:
+            mapper.SetLookupTable(clut)
+
+    def _makeLODSource(self, sampleRate):
+        """
+        decimated grid keeping every n-th sample, boundary included - image data keeps it only when
+        sample rate divides grid, boundary sample would break uniform spacing otherwise
+        """
+        includeBoundary = True
+        if self.gridData:
+            extract = vtk.vtkExtractGrid()
+            geometry = vtk.vtkStructuredGridGeometryFilter()
+        elif self.imageData:
+            extract = vtk.vtkExtractVOI()
+            geometry = vtk.vtkImageDataGeometryFilter()
+            dims = self.gridfunc.GetDimensions()
+            includeBoundary = (dims[0] - 1) % sampleRate == 0 and (dims[1] - 1) % sampleRate == 0
+        else:
+            extract = vtk.vtkExtractRectilinearGrid()
+            geometry = vtk.vtkRectilinearGridGeometryFilter()
+
+        extract.SetInputData(self.gridfunc)
+        extract.SetVOI(self._gridExtent())
+        self.lodExtracts.append(extract)
+        extract.SetSampleRate(sampleRate, sampleRate, 1)
+        extract.SetIncludeBoundary(includeBoundary)
+        geometry.SetInputConnection(extract.GetOutputPort())
+
+        return self._maskedSource(geometry, **self.renderArgs)
+
+    def makeLODSurface(self, lodLevels=LOD_LEVELS, wireSurface=False, minSize=LOD_MIN_SIZE):
+        """
+        create level of detail surface - full resolution surface plus pyramid of decimated surfaces,
+        vtk picks the level that fits allocated render time so interaction stays responsive
+        """
+        surfplot = vtk.vtkLODProp3D()
+        prop = vtk.vtkProperty()
+        if wireSurface:
+            prop.SetRepresentationToWireframe()
+        surfplot.AddLOD(self.mapper, prop, 0.0)
+
+        # decimated mappers of shared pipeline are reused
+        if not self.shared:
+            self._makeLODMappers(lodLevels, minSize)
+
+        for level, mapper in enumerate(self.lodMappers):
+            lod = surfplot.AddLOD(mapper, prop, 0.0)
+            surfplot.SetLODLevel(lod, level + 1)
+
+        surfplot.AutomaticLODSelectionOn()
+
+        return surfplot
+
+    def _makeLODMappers(self, lodLevels=LOD_LEVELS, minSize=LOD_MIN_SIZE):
+        """ create decimated surface mappers """
+        extent = self._gridExtent()
+        dims = (extent[1] - extent[0] + 1, extent[3] - extent[2] + 1)
+        self.lodMappers = []
+        self.lodWarps = []
+        self.lodExtracts = []
+
+        for sampleRate in sorted(lodLevels):
+            if min(dims[0], dims[1]) / sampleRate < minSize:
+                break
+
+            geometry = self._makeLODSource(sampleRate)
+            trans = vtk.vtkTransformPolyDataFilter()
+            trans.SetInputConnection(geometry.GetOutputPort())
+            trans.SetTransform(self.transform)
+
+            warp = self._makeWarp(trans, self.warp.GetScaleFactor())
+
+            mapper = vtk.vtkPolyDataMapper()
+            mapper.SetInputConnection(warp.GetOutputPort())
+            mapper.SetScalarRange(self.mapper.GetScalarRange())
+
+            self.lodMappers.append(mapper)
+            self.lodWarps.append(warp)
+
+    def _placePlaneGrid(self, bounds, x_, y_):
+        """ place plane grid under the surface """
+        self.planeTransform.Identity()
+        self.planeTransform.Translate((bounds[1] - bounds[0]) / 2. - (0 - bounds[0]),
+                                      (bounds[3] - bounds[2]) / 2. - (0 - bounds[2]), bounds[4])
+        self.planeTransform.Scale(x_, y_, 1)
+
+    def _updatePlacements(self, bounds):
+        """ update bounds dependent objects after in place data change """
+        if self.planeTransform:
+            self._placePlaneGrid(bounds, bounds[1] - bounds[0], bounds[3] - bounds[2])
+
+        if self.XCutterTransform:
+            self._placeXCutter(bounds, self._calculateXCutterPos(self.XCutterValue))
+
+        if self.YCutterTransform:
+            self._placeYCutter(bounds, self._calculateYCutterPos(self.YCutterValue))
+
+        if self.ZCutterTransform:
+            self._placeZCutter(bounds, self._calculateZCutterPos(self.ZCutterValue))
+
+        if self.gridAxes:
+            self.gridAxes.SetBounds(bounds[0], bounds[1], bounds[2], bounds[3], bounds[4], bounds[4])
+
+        if self.axes:
+            self.axes.SetRanges(self._dataBounds())
+
     def _addPlaneCutters(self, xactor, yactor, zactor, xCutterOn, yCutterOn, zCutterOn):
         ''' add plane cutters  '''
 
@@ -1311,10 +2430,16 @@ class VTKSurface3D(object):
         if not path:
             return
 
-        renWin = self.getRenderWindow()
+        renWin = self.renderer.GetRenderWindow()
+        if renWin is None:
+            logging.error('Renderer is not attached to render window')
+            return
+
+        renWin.Render()
         w2i = vtk.vtkWindowToImageFilter()
         w2i.SetMagnification(1)
         w2i.SetInputBufferTypeToRGBA()
+        w2i.ReadFrontBufferOff()
         w2i.SetInput(renWin)
         w2i.Update()
 
@@ -1322,7 +2447,5 @@ class VTKSurface3D(object):
 
         pngfile.SetInputConnection(w2i.GetOutputPort())
         pngfile.SetFileName(path)
-
-        self.redraw()
         pngfile.Write()
 
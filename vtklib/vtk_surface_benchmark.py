@@ -0,0 +1,215 @@
+"""
+VTK surface pipeline benchmark - times VTKSurface3D lifecycle stages on synthetic grids, writes json results
+
+    python vtk_surface_benchmark.py --sizes 100 1000 4000 --variants z v nan --output bench.json
+"""
+
+import sys
+import json
+import time
+import platform
+import argparse
+import logging
+import multiprocessing
+from collections import OrderedDict
+
+import numpy
+import vtk
+from timings import StageTimings, maxrss, stage, stage_timings
+from vtk_surface import VTKSurface3D, convertData, gridOptions
+
+
+# grid sizes and data variants benchmarked by default
+SIZES = (100, 500, 1000, 2000, 4000)
+VARIANTS = ('z', 'v', 'nan')
+
+# largest grid converted from (x, [(y, z[, v]), ...]) pairs, python tuples do not scale further
+PAIRS_LIMIT = 500 * 500
+
+# fraction of missing values in nan variant, like nonedatarandom
+NAN_FRACTION = 0.03
+
+# cutter positions per axis in cutter stages
+CUTTER_MOVES = 3
+
+# surface grid options, auto picks grid type like VTKSurface3D does
+GRIDS = OrderedDict([
+    ('auto', {}),
+    ('structured', {'gridData': True}),
+    ('rectilinear', {'gridData': False}),
+    ('image', {'gridData': False, 'imageData': True}),
+])
+
+
+def makeGrid(nx, ny, variant='z', seed=0):
+    """ synthetic columnar (x, y, Z[, V]) grid - v adds V scalars, nan punches random holes """
+    x = numpy.linspace(-7., 7., nx)
+    y = numpy.linspace(-5., 5., ny)
+    z = numpy.sin(x)[:, numpy.newaxis] * numpy.cos(y)[numpy.newaxis, :] * numpy.exp(-0.05 * x * x)[:, numpy.newaxis]
+
+    if variant == 'nan':
+        rand = numpy.random.RandomState(seed)
+        z.flat[rand.randint(0, z.size, int(z.size * NAN_FRACTION))] = numpy.nan
+
+    if variant == 'v':
+        return x, y, z, numpy.hypot(*numpy.meshgrid(x, y, indexing='ij'))
+
+    return x, y, z
+
+
+def toPairs(data):
+    """ columnar grid as list of (x, [(y, z[, v]), ...]) pairs """
+    x, y, z = data[:3]
+    if len(data) == 4:
+        return [(x[i], zip(y, z[i], data[3][i])) for i in xrange(x.size)]
+    return [(x[i], zip(y, z[i])) for i in xrange(x.size)]
+
+
+def runCase(nx, ny, variant='z', draw=False, cutterMoves=CUTTER_MOVES, precision=None, grid='auto'):
+    """
+    time surface lifecycle stages of one grid, run in fresh process so memory peak is its own - pipeline stages
+    profiled by the surface itself (conversion, array_fill, geometry, warp, mapper, ...) are reported too
+    """
+    logging.disable(logging.CRITICAL)
+    baseline = maxrss()
+    lifecycle = StageTimings()
+
+    with stage_timings() as pipeline:
+        with stage('generate', lifecycle):
+            data = makeGrid(nx, ny, variant)
+
+        if nx * ny <= PAIRS_LIMIT:
+            pairs = toPairs(data)
+            with stage('convert_pairs', lifecycle):
+                convertData(pairs, precision=precision)
+            del pairs
+
+        with stage('convert', lifecycle):
+            vx, vy, vz, mv = convertData(data, precision=precision)
+        del data
+
+        options = gridOptions(vx, vy, vz, dict(GRIDS[grid], precision=precision))
+
+        renderer = vtk.vtkRenderer()
+        surface = VTKSurface3D(None, renderer=renderer, doRender=False, profile=True)
+
+        with stage('render_geometry', lifecycle):
+            surface.render_geometry(vx, vy, vz, mv, **options)
+        with stage('render', lifecycle):
+            surface.render(**options)
+        surface.calculatePositions()
+        surface.setDefaultView()
+
+        window = None
+        if draw:
+            window = vtk.vtkRenderWindow()
+            window.SetOffScreenRendering(1)
+            window.SetSize(800, 600)
+            window.AddRenderer(renderer)
+            with stage('draw', lifecycle):
+                window.Render()
+
+        update = (vx, vy, vz * 0.5) + ((mv,) if len(mv) else ())
+        with stage('update_inplace', lifecycle):
+            surface.SetValue(update, **options)
+
+        def moveCutter(move, getData, limit):
+            for value in numpy.linspace(0.1, 0.9, cutterMoves):
+                move(limit[0] + value * (limit[1] - limit[0]))
+                getData()
+
+        with stage('cutter_x', lifecycle):
+            moveCutter(surface.moveXCutter, surface.getXCutterData, surface.XLimit)
+        with stage('cutter_y', lifecycle):
+            moveCutter(surface.moveYCutter, surface.getYCutterData, surface.YLimit)
+        with stage('cutter_z', lifecycle):
+            moveCutter(surface.moveZCutter, surface.getZCutterData, surface.ZLimit)
+        with stage('colormap', lifecycle):
+            surface.applyColorMap('jet')
+
+        if window:
+            with stage('redraw', lifecycle):
+                window.Render()
+
+    stages = OrderedDict((name, s['total']) for name, s in lifecycle.stages.iteritems())
+    stages['total'] = sum(stages.values())
+
+    # lifecycle stages are collected by pipeline timings as well
+    internal = OrderedDict((name, s) for name, s in pipeline.summary().iteritems() if name not in lifecycle.stages)
+
+    return OrderedDict([
+        ('size', [nx, ny]),
+        ('variant', variant),
+        ('precision', precision),
+        ('grid', surface.gridfunc.GetClassName()),
+        ('points', nx * ny),
+        ('stages', stages),
+        ('pipeline', internal),
+        ('maxrss_mb', round(maxrss(), 1)),
+        ('case_rss_mb', round(maxrss() - baseline, 1)),
+    ])
+
+
+def _runCase(args):
+    """ pool entry """
+    return runCase(*args)
+
+
+def environment():
+    """ versions the results belong to """
+    return OrderedDict([
+        ('python', platform.python_version()),
+        ('numpy', numpy.__version__),
+        ('vtk', vtk.vtkVersion.GetVTKVersion()),
+        ('platform', platform.platform()),
+        ('time', time.strftime('%Y-%m-%dT%H:%M:%S')),
+    ])
+
+
+def run(sizes=SIZES, variants=VARIANTS, draw=False, tag=None, cutterMoves=CUTTER_MOVES, precision=None, grid='auto'):
+    """ run all cases, each in its own process, returns results """
+    cases = [(n, n, variant, draw, cutterMoves, precision, grid) for n in sizes for variant in variants]
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+    results = []
+    try:
+        for case in cases:
+            try:
+                result = pool.apply(_runCase, (case,))
+            except Exception as e:
+                logging.error('Case %s failed: %s', case, e)
+                result = OrderedDict([('size', list(case[:2])), ('variant', case[2]), ('error', str(e))])
+            results.append(result)
+            logging.info('%s', json.dumps(result))
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+    return OrderedDict([('tag', tag), ('environment', environment()), ('cases', results)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='VTK surface pipeline benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='grid sizes n for n x n grids')
+    parser.add_argument('--variants', nargs='+', default=VARIANTS, choices=VARIANTS,
+                        help='z only, with v scalars, with nan holes')
+    parser.add_argument('--draw', action='store_true', help='time offscreen window renders too')
+    parser.add_argument('--cutter-moves', type=int, default=CUTTER_MOVES, help='cutter positions per axis')
+    parser.add_argument('--precision', default=None, choices=('float32', 'float64'),
+                        help='surface precision, data dtype kept by default')
+    parser.add_argument('--grid', default='auto', choices=GRIDS.keys(), help='surface grid type')
+    parser.add_argument('--tag', default=None, help='label stored with results, e.g. version')
+    parser.add_argument('--output', default='-', help='json file, stdout by default')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.variants, args.draw, args.tag, args.cutter_moves, args.precision, args.grid)
+
+    if args.output == '-':
+        json.dump(results, sys.stdout, indent=2)
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
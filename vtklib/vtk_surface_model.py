@@ -1,10 +1,75 @@
 """
 VTK surface model
 """
+import logging
+import threading
 from atom.api import List, Value, Dict
-from renderers import VTKRenderController
-from vtk_surface import VTKSurface3D, remap
 from enaml.application import deferred_call
+from renderers import VTKRenderController
+from vtk_surface import VTKSurface3D, remap, prepareSurface
+
+
+class SurfaceLoad(object):
+    """
+    background surface load - worker thread converts data and builds vtk arrays, progress and result are
+    handed to gui thread through deferred_call, where prepared data is applied unless load was cancelled
+    """
+
+    def __init__(self, data, apply, progress=None, done=None, **kwargs):
+        """ default init
+                apply    - called on gui thread with prepared data stage, returns True when applied
+                progress - called on gui thread with stage name and fraction done
+                done     - called on gui thread with True when data is applied, False when preparation failed
+                kwargs   - surface properties, same as VTKSurface3D
+        """
+        self.apply = apply
+        self.progress = progress
+        self.done = done
+        self.cancelled = False
+        self.finished = False
+        self.thread = threading.Thread(target=self._run, args=(data, kwargs))
+        self.thread.daemon = True
+
+    def start(self):
+        """ start preparation """
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """ stop preparation at next stage, prepared data is dropped """
+        self.cancelled = True
+
+    def isCancelled(self):
+        """ cancel flag """
+        return self.cancelled
+
+    def _run(self, data, kwargs):
+        """ worker thread """
+        try:
+            prepared = prepareSurface(data, progress=self._progress, cancelled=self.isCancelled, **kwargs)
+        except Exception as e:
+            logging.error('Surface preparation failed: %s', e)
+            prepared = None
+        deferred_call(self._finish, prepared)
+
+    def _progress(self, name, fraction):
+        """ forward progress to gui thread """
+        if self.progress and not self.cancelled:
+            deferred_call(self._report, name, fraction)
+
+    def _report(self, name, fraction):
+        """ gui thread """
+        if not self.cancelled:
+            self.progress(name, fraction)
+
+    def _finish(self, prepared):
+        """ gui thread - apply prepared data """
+        if self.cancelled:
+            return
+        self.finished = True
+        applied = prepared is not None and self.apply(prepared)
+        if self.done:
+            self.done(applied)
 
 
 class VTKSurface3DModelController(VTKRenderController):
@@ -14,9 +79,13 @@ class VTKSurface3DModelController(VTKRenderController):
     properties = Dict()
     data = Value()
     surface = Value()
+    loading = Value()
 
     def __init__(self, *args, **kwargs):
-        """ default init """
+        """ default init
+                data      - list of (x, [(y, z[, v]), ...]) pairs or columnar (x, y, Z[, V]) numpy data
+                remapData - remap 2D numpy array using natural indexes as x and y
+        """
         VTKRenderController.__init__(self, *args, **kwargs)
         self.surfaces = []
         self.data = kwargs.pop('data', [])
@@ -24,9 +93,12 @@ class VTKSurface3DModelController(VTKRenderController):
         self.properties = kwargs
         if remapData:
             self.data = remap(self.data)
-        if self.renderers:
-            for i in xrange(len(self.renderers)):
-                self.surfaces.append(VTKSurface3D(self.data, parent=self, renderer=self.renderers[i], **kwargs))
+        # first surface owns data and pipeline, other renderers only add their views of it
+        shared = None
+        for renderer in self.renderers:
+            surface = VTKSurface3D(self.data, parent=self, renderer=renderer, shared=shared, **kwargs)
+            self.surfaces.append(surface)
+            shared = shared or surface
         if self.surfaces:
             self.surface = self.surfaces[0]
 
@@ -61,18 +133,61 @@ class VTKSurface3DModelController(VTKRenderController):
                 if data:
                     pass
 
+    def set_data(self, data, **kwargs):
+        """ set new data on all surfaces - in place when possible """
+        self.cancel_loading()
+        self.data = data
+        args = dict(self.properties, **kwargs)
+        for surface in self.surfaces:
+            surface.SetValue(data, **args)
+
+    def set_data_async(self, data, progress=None, done=None, **kwargs):
+        """
+        set new data without blocking gui - conversion and vtk arrays are prepared on worker thread,
+        surfaces are rebuilt from them on gui thread, pending load is cancelled, returns SurfaceLoad
+            progress - called with stage name and fraction done
+            done     - called with True when data is shown, False on failure
+        """
+        self.cancel_loading()
+        args = dict(self.properties, **kwargs)
+
+        def apply(prepared):
+            self.loading = None
+            self.data = data
+            for surface in self.surfaces:
+                surface.applyData(prepared)
+            self.invalidate()
+            return bool(self.surfaces) and self.surfaces[0].hasData
+
+        self.loading = SurfaceLoad(data, apply, progress, done, **args).start()
+        return self.loading
+
+    def cancel_loading(self):
+        """ cancel pending background load """
+        if self.loading:
+            self.loading.cancel()
+            self.loading = None
+
+    def append_row(self, x, z, v=None, max_length=None):
+        """ append row at x to all surfaces, oldest row is dropped once max_length rows are shown """
+        for surface in self.surfaces:
+            surface.appendRow(x, z, v, maxLength=max_length)
+
+    def append_column(self, y, z, v=None, max_length=None):
+        """ append column at y to all surfaces, oldest column is dropped once max_length columns are shown """
+        for surface in self.surfaces:
+            surface.appendColumn(y, z, v, maxLength=max_length)
+
     def invalidate(self):
         """ invalidate model """
-        if self.view:
-            deferred_call(self.view.render)
+        self.requestRender()
 
     def set_background(self, background):
         """
         set models background
         """
         self.bgColor = background
-        if self.view:
-            deferred_call(self.view.render)
+        self.requestRender()
 
     def set_interactor_style(self, style):
         """
@@ -0,0 +1,359 @@
+"""
+Tiled vtk surface - surfaces larger than memory split into lazily loaded tiles
+"""
+
+import collections
+import math
+import logging
+import numpy
+import vtk
+import colors
+from vtk.util import numpy_support
+from vtk_surface import gridPoints, gridScalars, colorAsFloatValues
+
+
+logging.basicConfig(format='%(asctime)s: %(levelname)s: %(message)s', level=logging.DEBUG)
+
+
+TILE_SIZE = 256
+MAX_LOADED_TILES = 64
+MAX_CACHED_BYTES = 64 * 1024 * 1024
+MIN_TILE_PIXELS = 8
+MAX_TILE_STEP = 32
+RANGE_SCAN_ROWS = 1024
+
+
+def scanRange(z, rows=RANGE_SCAN_ROWS):
+    """ nan aware min/max of Z matrix read in row blocks - bounded memory for mapped data """
+    zmin, zmax = numpy.inf, -numpy.inf
+    for i in xrange(0, z.shape[0], rows):
+        block = numpy.asarray(z[i:i + rows])
+        if numpy.isnan(block).all():
+            continue
+        zmin = min(zmin, numpy.nanmin(block))
+        zmax = max(zmax, numpy.nanmax(block))
+
+    if zmin > zmax:
+        return 0., 0.
+
+    return float(zmin), float(zmax)
+
+
+def tileIndexes(start, stop, step):
+    """ sample indexes from start to stop inclusive, stop always included """
+    ind = numpy.arange(start, stop + 1, step)
+    if ind[-1] != stop:
+        ind = numpy.append(ind, stop)
+    return ind
+
+
+class SurfaceTile(object):
+    """ single surface tile with its own pipeline """
+
+    def __init__(self, index, xspan, yspan):
+        """ default init
+                index - (column, row) tile index
+                xspan - first and last x index covered by the tile, inclusive
+                yspan - first and last y index covered by the tile, inclusive
+        """
+        self.index = index
+        self.xspan = xspan
+        self.yspan = yspan
+        self.step = None
+        self.grid = None
+        self.actor = None
+
+    def load(self, x, y, z, step, lut, scalarRange):
+        """ load tile data sampled at given step and build its pipeline """
+        ii = tileIndexes(self.xspan[0], self.xspan[1], step)
+        jj = tileIndexes(self.yspan[0], self.yspan[1], step)
+        vx, vy = x[ii], y[jj]
+        vz = numpy.asarray(z[numpy.ix_(ii, jj)])
+
+        points = vtk.vtkPoints()
+        points.SetData(numpy_support.numpy_to_vtk(gridPoints(vx, vy, vz)))
+
+        self.grid = vtk.vtkStructuredGrid()
+        self.grid.SetDimensions(vx.size, vy.size, 1)
+        self.grid.SetPoints(points)
+        self.grid.GetPointData().SetScalars(numpy_support.numpy_to_vtk(gridScalars(vz)))
+
+        geometry = vtk.vtkStructuredGridGeometryFilter()
+        geometry.SetInputData(self.grid)
+
+        mapper = vtk.vtkPolyDataMapper()
+        mapper.SetInputConnection(geometry.GetOutputPort())
+        mapper.SetLookupTable(lut)
+        mapper.SetScalarRange(scalarRange)
+
+        if self.actor is None:
+            self.actor = vtk.vtkActor()
+        self.actor.SetMapper(mapper)
+        self.step = step
+
+    def unload(self):
+        """ release tile data """
+        self.grid = None
+        self.step = None
+        if self.actor:
+            self.actor.SetMapper(None)
+
+    def isLoaded(self):
+        """ tile has data """
+        return self.grid is not None
+
+    def nbytes(self):
+        """ approximate tile memory """
+        return self.grid.GetActualMemorySize() * 1024 if self.grid else 0
+
+
+class VTKTiledSurface3D(object):
+    """
+    surface for grids that do not fit in memory - grid is split into fixed size tiles loaded lazily
+    from (memory mapped) Z matrix, tiles outside of view frustum are not loaded and tiles small on screen
+    are loaded at coarse resolution, tiles that left the view are kept only within count and memory budget
+    """
+
+    def __init__(self, data, **kwargs):
+        """
+        default init
+            data - columnar (x, y, Z) data, Z may be numpy.memmap or any 2D array supporting slicing
+        """
+        self.kwargs = kwargs
+        self.parent = kwargs.get('parent', None)
+        self.renderer = kwargs.get('renderer', None)
+        self.fgColor = colorAsFloatValues(kwargs.get('fgColor', colors.WHITE))
+        self.tileSize = kwargs.get('tileSize', TILE_SIZE)
+        self.maxLoadedTiles = kwargs.get('maxLoadedTiles', MAX_LOADED_TILES)
+        self.maxCachedBytes = kwargs.get('maxCachedBytes', MAX_CACHED_BYTES)
+        self.minTilePixels = kwargs.get('minTilePixels', MIN_TILE_PIXELS)
+        self.maxTileStep = kwargs.get('maxTileStep', MAX_TILE_STEP)
+        self.colorMap = kwargs.get('colorMap', 'rainbow')
+        self.reverseMap = kwargs.get('reverseMap', False)
+        self.actors = []
+        self.tiles = {}
+        self.loaded = collections.OrderedDict()
+        self.observer = None
+
+        if self.renderer is None:
+            raise Exception('No renderer defined ')
+
+        x, y, self.z = data[:3]
+        self.x = numpy.asarray(x)
+        self.y = numpy.asarray(y)
+
+        if self.z.ndim != 2 or self.z.shape != (self.x.size, self.y.size):
+            raise Exception('X, Y and Z dimension not match: %s' % str((self.x.size, self.y.size, self.z.shape)))
+
+        self.XLimit = (self.x.min(), self.x.max())
+        self.YLimit = (self.y.min(), self.y.max())
+        self.ZLimit = kwargs.get('zRange', None) or scanRange(self.z)
+
+        self.render(**kwargs)
+
+    def getDataRanges(self):
+        """ Return data ranges """
+        return self.XLimit, self.YLimit, self.ZLimit
+
+    def redraw(self):
+        """ invalidate graph """
+        if self.parent:
+            self.parent.invalidate()
+
+    def makeTiles(self):
+        """ split grid index space into tiles sharing edges """
+        nx, ny = self.x.size, self.y.size
+        self.tiles = {}
+        for ti, i0 in enumerate(xrange(0, max(nx - 1, 1), self.tileSize)):
+            for tj, j0 in enumerate(xrange(0, max(ny - 1, 1), self.tileSize)):
+                i1 = min(i0 + self.tileSize, nx - 1)
+                j1 = min(j0 + self.tileSize, ny - 1)
+                self.tiles[(ti, tj)] = SurfaceTile((ti, tj), (i0, i1), (j0, j1))
+
+        keys = sorted(self.tiles)
+        self.tileKeys = keys
+
+        # world bounds of every tile - z uses global data range, used for frustum culling only
+        bounds = numpy.empty((len(keys), 6))
+        for n, key in enumerate(keys):
+            tile = self.tiles[key]
+            bounds[n] = (self.x[tile.xspan[0]], self.x[tile.xspan[1]],
+                         self.y[tile.yspan[0]], self.y[tile.yspan[1]],
+                         self.ZLimit[0], self.ZLimit[1])
+
+        bounds = bounds * numpy.repeat(self.scale, 2) + numpy.repeat(self.offset, 2)
+
+        # handle descending axes
+        self.tileBounds = numpy.empty_like(bounds)
+        self.tileBounds[:, 0::2] = numpy.minimum(bounds[:, 0::2], bounds[:, 1::2])
+        self.tileBounds[:, 1::2] = numpy.maximum(bounds[:, 0::2], bounds[:, 1::2])
+
+    def GetBounds(self):
+        """ world bounds of whole surface """
+        b = self.tileBounds
+        return b[:, 0].min(), b[:, 1].max(), b[:, 2].min(), b[:, 3].max(), b[:, 4].min(), b[:, 5].max()
+
+    def render(self, **args):
+        """ create tiles, outline and colorbar """
+        drawBox = args.get('drawBox', True)
+        drawColorBar = args.get('drawColorBar', True)
+
+        # surface normalized into unit base and half unit height
+        xr = float(self.XLimit[1] - self.XLimit[0]) or 1.
+        yr = float(self.YLimit[1] - self.YLimit[0]) or 1.
+        zr = float(self.ZLimit[1] - self.ZLimit[0]) or 1.
+        self.scale = numpy.array((1. / xr, 1. / yr, 0.5 / zr))
+        self.offset = -numpy.array((self.XLimit[0], self.YLimit[0], self.ZLimit[0])) * self.scale
+
+        self.lut = colors.buildColormap(self.colorMap, self.reverseMap)
+        self.makeTiles()
+
+        bounds = self.GetBounds()
+
+        if drawBox:
+            outline = vtk.vtkOutlineSource()
+            outline.SetBounds(bounds)
+            mapper = vtk.vtkPolyDataMapper()
+            mapper.SetInputConnection(outline.GetOutputPort())
+            actor = vtk.vtkActor()
+            actor.SetMapper(mapper)
+            actor.GetProperty().SetColor(self.fgColor)
+            self.renderer.AddActor(actor)
+            self.actors.append(actor)
+
+        if drawColorBar:
+            colorbar = vtk.vtkScalarBarActor()
+            colorbar.SetLookupTable(self.lut)
+            colorbar.SetWidth(0.085)
+            colorbar.SetHeight(0.8)
+            colorbar.SetPosition(0.9, 0.1)
+            colorbar.SetNumberOfLabels(5)
+            colorbar.GetLabelTextProperty().SetColor(self.fgColor)
+            self.renderer.AddActor(colorbar)
+            self.actors.append(colorbar)
+
+        self.observer = self.renderer.AddObserver('StartEvent', self._onRenderStart)
+        self.setDefaultView()
+
+    def setDefaultView(self):
+        """ look at whole surface """
+        cam = self.renderer.GetActiveCamera()
+        cam.SetViewUp(0, 0, 1)
+        cam.SetFocalPoint(0.5, 0.5, 0.25)
+        cam.SetPosition(0.5, -2.5, 2.0)
+        self.renderer.ResetCamera(self.GetBounds())
+        self.redraw()
+
+    def applyColorMap(self, colorMap='rainbow', reverse=False):
+        """ apply color map on all tiles """
+        self.colorMap, self.reverseMap = colorMap, reverse
+        lut = colors.buildColormap(colorMap, reverse)
+        self.lut.DeepCopy(lut)
+        self.lut.SetRange(self.ZLimit)
+        self.redraw()
+
+    def clear(self):
+        """ remove tiles and actors from renderer """
+        for tile in self.loaded.itervalues():
+            self.renderer.RemoveActor(tile.actor)
+            tile.unload()
+        self.loaded.clear()
+        for a in self.actors:
+            self.renderer.RemoveActor(a)
+        self.actors = []
+        if self.observer is not None:
+            self.renderer.RemoveObserver(self.observer)
+            self.observer = None
+
+    def getLoadedTiles(self):
+        """ currently loaded tiles """
+        return self.loaded.values()
+
+    def _onRenderStart(self, obj, event):
+        """ update tiles before renderer draws props """
+        self.updateTiles()
+
+    def visibleTiles(self):
+        """
+        tiles intersecting view frustum with their size on screen in pixels - size is taken from x/y footprint
+        of tile at mid height, global z range of tile bounds would make every tile as large as whole surface
+        """
+        cam = self.renderer.GetActiveCamera()
+        aspect = self.renderer.GetTiledAspectRatio()
+
+        planes = [0.] * 24
+        cam.GetFrustumPlanes(aspect, planes)
+        planes = numpy.array(planes).reshape(6, 4)
+
+        b = self.tileBounds
+        corners = numpy.empty((len(b), 8, 4))
+        for n, (i, j, k) in enumerate([(i, j, k) for i in (0, 1) for j in (2, 3) for k in (4, 5)]):
+            corners[:, n] = numpy.column_stack((b[:, i], b[:, j], b[:, k], numpy.ones(len(b))))
+
+        # box is outside when all its corners are behind any of frustum planes
+        dist = numpy.einsum('tcx,px->tcp', corners, planes)
+        visible = ~(dist < 0).all(axis=1).any(axis=1)
+
+        # projected size of tile footprint in pixels
+        footprint = corners[:, ::2].copy()
+        footprint[:, :, 2] = (b[:, 4] + b[:, 5])[:, numpy.newaxis] / 2.
+        m = cam.GetCompositeProjectionTransformMatrix(aspect, -1, 1)
+        mat = numpy.array([[m.GetElement(i, j) for j in xrange(4)] for i in xrange(4)])
+        proj = numpy.einsum('tcx,yx->tcy', footprint, mat)
+        w = proj[:, :, 3]
+        front = (w > 0).all(axis=1)
+        ndc = proj[:, :, :2] / numpy.where(w > 0, w, 1)[:, :, numpy.newaxis]
+        width, height = self.renderer.GetSize()
+        extent = (ndc.max(axis=1) - ndc.min(axis=1)) / 2. * (width, height)
+        pixels = numpy.where(front, extent.max(axis=1), numpy.inf)
+
+        return [(self.tileKeys[n], pixels[n]) for n in numpy.flatnonzero(visible)]
+
+    def tileStep(self, pixels):
+        """ sampling step of tile with given size on screen - about one grid node per pixel """
+        if pixels < self.minTilePixels:
+            return self.maxTileStep
+
+        if not numpy.isfinite(pixels):
+            return 1
+
+        step = 2 ** int(math.floor(math.log(max(self.tileSize / pixels, 1), 2)))
+        return min(step, self.maxTileStep)
+
+    def updateTiles(self):
+        """
+        load visible tiles at screen size resolution, unload least recently used hidden ones over tile count
+        limit or cached memory budget
+        """
+        visible = self.visibleTiles()
+        visibleKeys = set(key for key, _pixels in visible)
+        scalarRange = self.ZLimit
+
+        # hide tiles that left the view, keep their data while within budget
+        for key, tile in self.loaded.iteritems():
+            if key not in visibleKeys:
+                tile.actor.VisibilityOff()
+
+        for key, pixels in visible:
+            tile = self.tiles[key]
+            step = self.tileStep(pixels)
+            if tile.step != step:
+                tile.load(self.x, self.y, self.z, step, self.lut, scalarRange)
+                tile.actor.SetScale(self.scale)
+                tile.actor.SetPosition(self.offset)
+                if key not in self.loaded:
+                    self.renderer.AddActor(tile.actor)
+            tile.actor.VisibilityOn()
+            self.loaded.pop(key, None)
+            self.loaded[key] = tile
+
+        # drop least recently used hidden tiles over the limits, visible tiles stay
+        hidden = [key for key in self.loaded if key not in visibleKeys]
+        cached = sum(self.loaded[key].nbytes() for key in hidden)
+        for key in hidden:
+            if len(self.loaded) <= self.maxLoadedTiles and cached <= self.maxCachedBytes:
+                break
+            tile = self.loaded.pop(key)
+            cached -= tile.nbytes()
+            self.renderer.RemoveActor(tile.actor)
+            tile.unload()